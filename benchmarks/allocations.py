@@ -0,0 +1,69 @@
+"""Compare the allocations of loading and discarding records with and without an object pool.
+
+The garbage collector runs a generation 0 collection every time the number
+of the allocated container objects exceeds a threshold, so the number of
+the collections shows how many objects a consumer allocates.
+
+Usage: PYTHONPATH=. python benchmarks/allocations.py [--batches N] [--batch-size N]
+"""
+import argparse
+import gc
+import time
+
+import marshmallow_objects as marshmallow
+
+
+class Event(marshmallow.Model):
+    id = marshmallow.fields.Int()
+    kind = marshmallow.fields.Str()
+    value = marshmallow.fields.Float()
+    source = marshmallow.fields.Str()
+
+    class Meta:
+        compact = True
+
+
+class PooledEvent(Event):
+    class Meta:
+        compact = True
+        pool_size = 1000
+
+
+def consume(model_class, data, batches, release):
+    total = 0.0
+    for _ in range(batches):
+        for obj in model_class.load(data, many=True):
+            total += obj.value
+            if release:
+                obj.release()
+    return total
+
+
+def measure(model_class, data, batches, release):
+    gc.collect()
+    start_collections = gc.get_stats()[0]["collections"]
+    start = time.perf_counter()
+    consume(model_class, data, batches, release)
+    elapsed = time.perf_counter() - start
+    return elapsed, gc.get_stats()[0]["collections"] - start_collections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    data = [dict(id=index, kind="click", value=1.5, source="web") for index in range(args.batch_size)]
+    records = args.batches * args.batch_size
+    print("%d batches of %d records" % (args.batches, args.batch_size))
+    for model_class, release in ((Event, False), (PooledEvent, True)):
+        elapsed, collections = measure(model_class, data, args.batches, release)
+        print(
+            "%-12s %8.0f records/s %6d gen0 collections"
+            % (model_class.__name__, records / elapsed, collections)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compare the load and dump times of long numeric series with NumericArray and fields.List.
+
+Usage: PYTHONPATH=. python benchmarks/arrays.py [--size N] [--repeat N]
+"""
+import argparse
+import time
+
+from marshmallow import validate
+
+import marshmallow_objects as marshmallow
+
+
+class ListSeries(marshmallow.Model):
+    values = marshmallow.fields.List(marshmallow.fields.Float(validate=validate.Range(min=0)))
+
+
+class ArraySeries(marshmallow.Model):
+    values = marshmallow.NumericArray("d", min=0, use_numpy=False)
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = {"values": [index * 0.5 for index in range(args.size)]}
+    models = [ListSeries, ArraySeries]
+    try:
+        import numpy  # noqa
+
+        class NumpySeries(marshmallow.Model):
+            values = marshmallow.NumericArray("d", min=0, use_numpy=True)
+
+        models.append(NumpySeries)
+    except ImportError:
+        print("numpy is not installed, skipping the numpy arrays")
+
+    print("%d values, best of %d" % (args.size, args.repeat))
+    for model_class in models:
+        obj = model_class.load(data)
+        load = measure(lambda: model_class.load(data), args.repeat)
+        dump = measure(obj.dump, args.repeat)
+        print("%-12s load %8.2f ms  dump %8.2f ms" % (model_class.__name__, load * 1000, dump * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Dump one shared Model object from many threads and report the throughput.
+
+Usage: PYTHONPATH=. python benchmarks/concurrent_dump.py [--threads N] [--dumps N]
+"""
+import argparse
+import threading
+import time
+
+import marshmallow_objects as marshmallow
+
+
+class Item(marshmallow.Model):
+    name = marshmallow.fields.Str()
+    price = marshmallow.fields.Float()
+    tags = marshmallow.fields.List(marshmallow.fields.Str())
+
+
+class Catalogue(marshmallow.Model):
+    name = marshmallow.fields.Str()
+    description = marshmallow.fields.Str()
+    items = marshmallow.NestedModel(Item, many=True)
+
+
+def run(obj, threads, dumps):
+    barrier = threading.Barrier(threads + 1)
+    expected = obj.dump()
+    errors = []
+
+    def worker():
+        barrier.wait()
+        for _ in range(dumps):
+            if obj.dump() != expected:
+                errors.append(1)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise AssertionError("%d dumps returned a wrong result" % len(errors))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--dumps", type=int, default=500)
+    args = parser.parse_args()
+
+    items = [dict(name="item%d" % index, price=index * 1.5, tags=["a", "b"]) for index in range(20)]
+    obj = Catalogue(name="catalogue", items=items)
+    for threads in sorted({1, args.threads}):
+        elapsed = run(obj, threads, args.dumps)
+        total = threads * args.dumps
+        print("%2d threads: %6d dumps in %6.3fs, %8.0f dumps/s" % (threads, total, elapsed, total / elapsed))
+
+
+if __name__ == "__main__":
+    main()
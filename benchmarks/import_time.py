@@ -0,0 +1,71 @@
+"""Measure the time needed to import marshmallow_objects and define models.
+
+Usage: python benchmarks/import_time.py [--models N] [--repeat N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+MODEL_TEMPLATE = """
+class Model{index}(marshmallow.Model):
+    name = marshmallow.fields.Str(required=True)
+    value = marshmallow.fields.Int(missing=0)
+    tags = marshmallow.fields.List(marshmallow.fields.Str())
+    parent = marshmallow.NestedModel({parent}, allow_none=True)
+"""
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+import marshmallow_objects as marshmallow
+imported = time.perf_counter()
+import models
+defined = time.perf_counter()
+if {compile_all}:
+    marshmallow.compile_all()
+compiled = time.perf_counter()
+models.Model0.load({{"name": "foo"}})
+used = time.perf_counter()
+print(imported - start, defined - imported, compiled - defined, used - compiled)
+"""
+
+
+def generate_models(path, count):
+    with open(os.path.join(path, "models.py"), "w") as fp:
+        fp.write("import marshmallow_objects as marshmallow\n")
+        for index in range(count):
+            parent = '"Model%d"' % (index - 1) if index else '"Model0"'
+            fp.write(MODEL_TEMPLATE.format(index=index, parent=parent))
+
+
+def run(path, compile_all, repeat):
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join([path, root, env.get("PYTHONPATH", "")])
+    script = SCRIPT.format(compile_all=compile_all)
+    results = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", script], env=env)
+        results.append([float(value) for value in output.split()])
+    return [min(column) for column in zip(*results)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        generate_models(path, args.models)
+        print("%d models, best of %d runs (ms)" % (args.models, args.repeat))
+        print("%-12s %10s %10s %10s %10s" % ("mode", "import", "define", "compile", "first use"))
+        for name, compile_all in (("lazy", False), ("compile_all", True)):
+            timings = run(path, compile_all, args.repeat)
+            print("%-12s %10.2f %10.2f %10.2f %10.2f" % ((name,) + tuple(t * 1000 for t in timings)))
+
+
+if __name__ == "__main__":
+    main()
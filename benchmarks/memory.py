@@ -0,0 +1,54 @@
+"""Measure the memory used per Model instance in the default and compact modes.
+
+Usage: PYTHONPATH=. python benchmarks/memory.py [--objects N]
+"""
+import argparse
+import gc
+import tracemalloc
+
+import marshmallow_objects as marshmallow
+
+
+class Point(marshmallow.Model):
+    x = marshmallow.fields.Int()
+    y = marshmallow.fields.Int()
+    z = marshmallow.fields.Int()
+    label = marshmallow.fields.Str()
+
+
+class CompactPoint(marshmallow.Model):
+    x = marshmallow.fields.Int()
+    y = marshmallow.fields.Int()
+    z = marshmallow.fields.Int()
+    label = marshmallow.fields.Str()
+
+    class Meta:
+        compact = True
+
+
+def measure(model_class, data):
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = model_class.load(data, many=True)
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=100000)
+    args = parser.parse_args()
+
+    # small ints and a shared string, so the numbers show the per-instance overhead only
+    data = [dict(x=1, y=2, label="point") for _ in range(args.objects)]
+    print("%d objects, 1 of 4 fields missing" % args.objects)
+    for model_class in (Point, CompactPoint):
+        size = measure(model_class, data)
+        print("%-14s %8.1f bytes per instance" % (model_class.__name__, float(size) / args.objects))
+
+
+if __name__ == "__main__":
+    main()
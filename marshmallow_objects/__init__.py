@@ -1,12 +1,25 @@
 from marshmallow import *  # noqa
 
+from marshmallow_objects.formats import (  # noqa
+    Format,
+    get_format,
+    register_format,
+    registered_formats,
+)
 from marshmallow_objects.models import (  # noqa
     Model,
     NestedModel,
+    PolymorphicNestedModel,
+    compile_all,
     dump_many,
+    dump_many_format,
     dump_many_json,
     dump_many_yaml,
+    dump_stream,
 )
+from marshmallow_objects.profiling import Profiler, profile  # noqa
+from marshmallow_objects.cache import CacheInfo, PayloadCache  # noqa
+from marshmallow_objects.arrays import NumericArray  # noqa
 
 fields.Boolean.truthy.update(["y", "Y", "yes", "Yes", "YES", "on", "On", "ON"])  # noqa
 fields.Boolean.falsy.update(["n", "N", "no", "No", "NO", "off", "Off", "OFF"])  # noqa
@@ -0,0 +1,120 @@
+import array
+import importlib.util
+import math
+
+from marshmallow import fields, validate
+
+_has_numpy = importlib.util.find_spec("numpy") is not None
+
+
+def _import_numpy():
+    import numpy
+
+    return numpy
+
+
+class NumericArray(fields.Field):
+    """A one-dimensional array of numbers loaded and dumped without per-element Python calls.
+
+    The values are loaded into a numpy array when numpy is installed, or into
+    an `array.array` otherwise. The typecode is any of the `array` module
+    typecodes and also defines the dtype of the numpy arrays. The range, the
+    `validate.Range` validators included, is validated over the whole array
+    at once and the arrays are dumped as lists. As for `fields.Float`, the
+    nan and infinity values are rejected unless `allow_nan` is set.
+
+        class Series(marshmallow.Model):
+            values = NumericArray("d", min=0)
+    """
+
+    default_error_messages = {
+        "invalid": "Not a valid numeric array.",
+        "min": "Must be greater than or equal to {min}.",
+        "max": "Must be less than or equal to {max}.",
+        "special": "Special numeric values (nan or infinity) are not permitted.",
+    }
+
+    def __init__(self, typecode="d", min=None, max=None, allow_nan=False, use_numpy=None, **kwargs):
+        if typecode not in array.typecodes or typecode == "u":
+            raise ValueError("Unsupported typecode '%s'" % typecode)
+        self.typecode = typecode
+        self.min = min
+        self.max = max
+        self.allow_nan = allow_nan
+        self.use_numpy = _has_numpy if use_numpy is None else use_numpy
+        super(NumericArray, self).__init__(**kwargs)
+        # the ranges are checked against the lowest and the highest values instead of every element
+        self.range_validators = [func for func in self.validators if isinstance(func, validate.Range)]
+        self.validators = [func for func in self.validators if not isinstance(func, validate.Range)]
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        return value.tolist()
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, (str, bytes, dict)):
+            raise self.make_error("invalid")
+        if self.use_numpy:
+            loaded, low, high = self._load_numpy(value)
+        else:
+            loaded, low, high = self._load_array(value)
+        if self.min is not None and low is not None and low < self.min:
+            raise self.make_error("min", min=self.min)
+        if self.max is not None and high is not None and high > self.max:
+            raise self.make_error("max", max=self.max)
+        if low is not None:
+            for validator in self.range_validators:
+                validator(low)
+                validator(high)
+        return loaded
+
+    def _load_array(self, value):
+        try:
+            loaded = array.array(self.typecode, value)
+        except (TypeError, ValueError, OverflowError):
+            raise self.make_error("invalid")
+        if not loaded:
+            return loaded, None, None
+        low, high = min(loaded), max(loaded)
+        if self.typecode in "fd":
+            # nan is not equal to itself, so the comparison finds it without a Python loop
+            has_nan = loaded != loaded
+            if has_nan or not (math.isfinite(low) and math.isfinite(high)):
+                inf_count = loaded.count(math.inf) + loaded.count(-math.inf)
+                if inf_count and self.typecode == "f":
+                    wide = array.array("d", value)
+                    if inf_count != wide.count(math.inf) + wide.count(-math.inf):
+                        # too big for a float
+                        raise self.make_error("invalid")
+                if not self.allow_nan:
+                    raise self.make_error("special")
+        return loaded, low, high
+
+    def _load_numpy(self, value):
+        numpy = _import_numpy()
+        try:
+            raw = numpy.asarray(value)
+        except (TypeError, ValueError):
+            raise self.make_error("invalid")
+        # the strings, objects and lossy casts are rejected, as by array.array
+        if raw.ndim != 1 or (raw.size and raw.dtype.kind not in "biuf"):
+            raise self.make_error("invalid")
+        dtype = numpy.dtype(self.typecode)
+        if raw.size and dtype.kind in "iu" and raw.dtype.kind == "f":
+            raise self.make_error("invalid")
+        with numpy.errstate(over="ignore"):
+            loaded = raw.astype(dtype)
+        if not loaded.size:
+            return loaded, None, None
+        if dtype.kind in "iu" and not numpy.array_equal(loaded, raw):
+            raise self.make_error("invalid")
+        if dtype.kind == "f" and not numpy.isfinite(loaded).all():
+            if numpy.count_nonzero(numpy.isinf(loaded)) != numpy.count_nonzero(numpy.isinf(raw)):
+                # too big for the dtype
+                raise self.make_error("invalid")
+            if not self.allow_nan:
+                raise self.make_error("special")
+        return loaded, loaded.min(), loaded.max()
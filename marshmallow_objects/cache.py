@@ -0,0 +1,97 @@
+import collections
+import hashlib
+import threading
+
+from marshmallow_objects.models import _clone_value, _freeze_value
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "evictions", "entries", "size", "max_bytes"])
+
+
+class PayloadCache(object):
+    """A bounded LRU cache of the models loaded from raw payloads.
+
+    The models are keyed by a hash of the raw payload, the model class,
+    the format and all the load options, so the repeated payloads are not
+    parsed, validated and loaded again. The frozen models are returned as
+    is, the other models are cloned on every hit to keep the cached objects
+    untouched, every copy has its own context. The size of an entry is the
+    length of its payload in bytes.
+
+        cache = PayloadCache(max_bytes=16 * 1024 * 1024)
+        config = TenantConfig.load_json(data, cache=cache)
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, model_class, format, data, context=None, many=None, partial=None, unknown=None, *args, **kwargs):
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        key = self._make_key(model_class, format, raw, context, many, partial, unknown, args, kwargs)
+        entry = None
+        with self._lock:
+            if key is not None:
+                entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            return self._copy(entry[0])
+
+        loaded = model_class.load_format(format, data, context, many, partial, unknown, *args, **kwargs)
+        if key is not None:
+            # a snapshot is cached, the context of the caller can be changed afterwards
+            self._put(key, self._snapshot(loaded), len(raw))
+        return loaded
+
+    def _make_key(self, model_class, format, raw, context, many, partial, unknown, args, kwargs):
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        key = (model_class, format, digest, many, partial, unknown, context, args, kwargs)
+        try:
+            key = _freeze_value(key)
+            hash(key)
+        except TypeError:
+            # the options having unhashable values are not cached
+            return None
+        return key
+
+    def _put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    @staticmethod
+    def _snapshot(value):
+        if isinstance(value, list):
+            return [_clone_value(item) for item in value]
+        return _clone_value(value)
+
+    @staticmethod
+    def _copy(value):
+        if isinstance(value, list):
+            return [item if item.__frozen__ else _clone_value(item) for item in value]
+        return value if value.__frozen__ else _clone_value(value)
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self.size, self.max_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
@@ -0,0 +1,424 @@
+import codecs
+import configparser
+import importlib.util
+import io
+import json
+import struct
+
+_formats = {}
+
+
+def register_format(fmt):
+    """Register a serialisation format under its name, replacing any existing one."""
+    _formats[fmt.name] = fmt
+    return fmt
+
+
+def get_format(name):
+    try:
+        return _formats[name]
+    except KeyError:
+        raise ValueError("The format '%s' is not registered" % name)
+
+
+def registered_formats():
+    return sorted(_formats)
+
+
+class Format(object):
+    """The base class of the serialisation formats.
+
+    A format converts the primitive data returned by `Model.dump` to a
+    document and back. The formats supporting streaming also implement
+    `load_stream` and `dump_stream`, reading and writing a sequence of
+    documents from and to a file object.
+    """
+
+    name = None
+    binary = False
+
+    def loads(self, data, *args, **kwargs):
+        raise NotImplementedError()
+
+    def dumps(self, data, *args, **kwargs):
+        raise NotImplementedError()
+
+    def load_stream(self, fp, *args, **kwargs):
+        raise NotImplementedError("The format '%s' does not support streaming" % self.name)
+
+    def dump_stream(self, documents, fp, *args, **kwargs):
+        raise NotImplementedError("The format '%s' does not support streaming" % self.name)
+
+
+class JsonFormat(Format):
+    """JSON documents, the streams are in the JSON Lines format."""
+
+    name = "json"
+
+    def loads(self, data, *args, render_module=json, **kwargs):
+        # the models may parse with another json module set by the render_module Meta option
+        return render_module.loads(data, *args, **kwargs)
+
+    def dumps(self, data, *args, **kwargs):
+        return json.dumps(data, *args, **kwargs)
+
+    def load_stream(self, fp, *args, **kwargs):
+        for line in fp:
+            if line.strip():
+                yield json.loads(line, *args, **kwargs)
+
+    def dump_stream(self, documents, fp, *args, **kwargs):
+        for document in documents:
+            fp.write(json.dumps(document, *args, **kwargs))
+            fp.write("\n")
+
+    def load_array(self, fp, chunk_size=65536):
+        """Parse a top level JSON array from a file object and yield its elements one by one.
+
+        The file object is read by chunks and only the current element is
+        kept in memory, so the size of the array is not limited by the memory.
+        """
+        return _JsonArrayParser(fp, chunk_size).parse()
+
+
+# a failure closer than that to the end of the buffer may be a literal or a number cut by the chunk
+_MAX_TOKEN_TAIL = 16
+
+
+class _JsonArrayParser(object):
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # the position of the buffer in the whole document
+        self.offset = 0
+        self.lineno = 1
+        self.colno = 1
+
+    def error(self, msg, index=None, pos=None):
+        if index is not None:
+            msg = "Element %d: %s" % (index, msg)
+        pos = self.pos if pos is None else pos
+        exc = json.JSONDecodeError(msg, self.buf, pos)
+        # the positions are reported in the whole document, not in the buffer
+        if exc.lineno == 1:
+            exc.colno += self.colno - 1
+        exc.lineno += self.lineno - 1
+        exc.pos += self.offset
+        exc.args = ("%s: line %d column %d (char %d)" % (msg, exc.lineno, exc.colno, exc.pos),)
+        return exc
+
+    def read(self, size):
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+        if isinstance(chunk, bytes):
+            chunk = self.text_decoder.decode(chunk, final=self.eof)
+        parsed = self.buf[:self.pos]
+        self.offset += len(parsed)
+        newlines = parsed.count("\n")
+        if newlines:
+            self.lineno += newlines
+            self.colno = len(parsed) - parsed.rfind("\n")
+        else:
+            self.colno += len(parsed)
+        # drop the parsed data, so the buffer holds the current element only
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def next_char(self, index):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                raise self.error("Unexpected end of the array", index)
+            self.read(self.chunk_size)
+
+    def parse_value(self, index):
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                # only an element cut at the end of the buffer is completed by reading more,
+                # the other errors are raised at once to not read the rest of the document
+                incomplete = exc.pos >= len(self.buf) - _MAX_TOKEN_TAIL or exc.msg.startswith("Unterminated string")
+                if self.eof or not incomplete:
+                    raise self.error(exc.msg, index, exc.pos)
+            else:
+                if self.eof or (end < len(self.buf) and self.buf[end] in " \t\n\r,]"):
+                    self.pos = end
+                    return value
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) - _MAX_TOKEN_TAIL:
+                    raise self.error("Expecting ',' delimiter", index, end)
+            # double the size to not re-parse a big element too many times
+            self.read(size)
+            size *= 2
+
+    def parse(self):
+        if self.next_char(None) != "[":
+            raise self.error("Expecting '['")
+        self.pos += 1
+        index = 0
+        if self.next_char(index) == "]":
+            self.pos += 1
+        else:
+            while True:
+                yield self.parse_value(index)
+                char = self.next_char(index)
+                self.pos += 1
+                if char == "]":
+                    break
+                if char != ",":
+                    self.pos -= 1
+                    raise self.error("Expecting ',' delimiter", index)
+                index += 1
+                self.next_char(index)
+        while True:
+            if self.buf[self.pos:].strip(" \t\n\r"):
+                raise self.error("Extra data after the array")
+            if self.eof:
+                break
+            self.pos = len(self.buf)
+            self.read(self.chunk_size)
+
+
+def _import_yaml():
+    import yaml
+
+    return yaml
+
+
+class YamlFormat(Format):
+    """YAML documents, the streams are multi-document YAML files."""
+
+    name = "yaml"
+
+    def loads(self, data, *args, **kwargs):
+        yaml = _import_yaml()
+        kwargs.setdefault("Loader", yaml.FullLoader)
+        return yaml.load(data, *args, **kwargs)
+
+    def dumps(self, data, default_flow_style=False, *args, **kwargs):
+        return _import_yaml().dump(data, default_flow_style=default_flow_style, *args, **kwargs)
+
+    def load_stream(self, fp, *args, **kwargs):
+        yaml = _import_yaml()
+        kwargs.setdefault("Loader", yaml.FullLoader)
+        return yaml.load_all(fp, *args, **kwargs)
+
+    def dump_stream(self, documents, fp, default_flow_style=False, *args, **kwargs):
+        _import_yaml().dump_all(documents, fp, default_flow_style=default_flow_style, *args, **kwargs)
+
+
+class IniFormat(Format):
+    """INI files, the sections are the nested documents and the defaults are the top level values."""
+
+    name = "ini"
+
+    def loads(self, data, **kwargs):
+        parser = configparser.ConfigParser(**kwargs)
+        parser.read_string(data)
+        ddata = {s: dict(parser.items(s)) for s in parser.sections()}
+        ddata.update(parser.defaults())
+        return ddata
+
+    def dumps(self, ddata, **kwargs):
+        data = {}
+        default_data = {}
+        for key, value in ddata.items():
+            if isinstance(value, dict):
+                data[key] = value
+            else:
+                default_data[key] = value
+        kwargs["defaults"] = default_data
+        parser = configparser.ConfigParser(**kwargs)
+        parser._sections = data
+        fp = io.StringIO()
+        parser.write(fp)
+        return fp.getvalue().strip()
+
+
+class MsgPackFormat(Format):
+    """MessagePack documents, registered only if the msgpack package is installed."""
+
+    name = "msgpack"
+    binary = True
+
+    def loads(self, data, *args, **kwargs):
+        import msgpack
+
+        kwargs.setdefault("raw", False)
+        return msgpack.unpackb(data, *args, **kwargs)
+
+    def dumps(self, data, *args, **kwargs):
+        import msgpack
+
+        kwargs.setdefault("use_bin_type", True)
+        return msgpack.packb(data, *args, **kwargs)
+
+    def load_stream(self, fp, *args, **kwargs):
+        import msgpack
+
+        kwargs.setdefault("raw", False)
+        return msgpack.Unpacker(fp, *args, **kwargs)
+
+    def dump_stream(self, documents, fp, *args, **kwargs):
+        import msgpack
+
+        kwargs.setdefault("use_bin_type", True)
+        packer = msgpack.Packer(*args, **kwargs)
+        for document in documents:
+            fp.write(packer.pack(document))
+
+
+_NONE = b"\x00"
+_FALSE = b"\x01"
+_TRUE = b"\x02"
+_INT = b"\x03"
+_FLOAT = b"\x04"
+_STR = b"\x05"
+_BYTES = b"\x06"
+_LIST = b"\x07"
+_DICT = b"\x08"
+_DOUBLE = struct.Struct(">d")
+
+
+def _write_varint(buf, value):
+    while value > 0x7F:
+        buf.append(0x80 | (value & 0x7F))
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(read):
+    result = 0
+    shift = 0
+    while True:
+        byte = _read(read, 1)[0]
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result
+        shift += 7
+
+
+def _read(read, size):
+    data = read(size)
+    if len(data) != size:
+        raise ValueError("Unexpected end of the binary data")
+    return data
+
+
+def _encode(buf, value):
+    if value is None:
+        buf += _NONE
+    elif value is True:
+        buf += _TRUE
+    elif value is False:
+        buf += _FALSE
+    elif isinstance(value, int):
+        buf += _INT
+        # zigzag encoding keeps the small negative numbers short
+        _write_varint(buf, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        buf += _FLOAT
+        buf += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        value = value.encode("utf-8")
+        buf += _STR
+        _write_varint(buf, len(value))
+        buf += value
+    elif isinstance(value, (bytes, bytearray)):
+        buf += _BYTES
+        _write_varint(buf, len(value))
+        buf += value
+    elif isinstance(value, (list, tuple)):
+        buf += _LIST
+        _write_varint(buf, len(value))
+        for item in value:
+            _encode(buf, item)
+    elif isinstance(value, dict):
+        buf += _DICT
+        _write_varint(buf, len(value))
+        for key, item in value.items():
+            _encode(buf, key)
+            _encode(buf, item)
+    else:
+        raise TypeError("Object of type '%s' is not supported by the binary format" % value.__class__.__name__)
+
+
+def _decode(read, tag):
+    if tag == _NONE:
+        return None
+    if tag == _TRUE:
+        return True
+    if tag == _FALSE:
+        return False
+    if tag == _INT:
+        value = _read_varint(read)
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+    if tag == _FLOAT:
+        return _DOUBLE.unpack(_read(read, 8))[0]
+    if tag == _STR:
+        return _read(read, _read_varint(read)).decode("utf-8")
+    if tag == _BYTES:
+        return _read(read, _read_varint(read))
+    if tag == _LIST:
+        return [_decode(read, _read(read, 1)) for _ in range(_read_varint(read))]
+    if tag == _DICT:
+        ret = {}
+        for _ in range(_read_varint(read)):
+            key = _decode(read, _read(read, 1))
+            ret[key] = _decode(read, _read(read, 1))
+        return ret
+    raise ValueError("Unknown type tag %r in the binary data" % tag)
+
+
+class BinaryFormat(Format):
+    """A compact tagged binary encoding implemented with the standard library only.
+
+    The integers are zigzag varints, the floats are 8 byte doubles and the
+    strings, bytes, lists and dicts are prefixed with their varint length.
+    The streams are the concatenated documents.
+    """
+
+    name = "binary"
+    binary = True
+
+    def loads(self, data):
+        fp = io.BytesIO(data)
+        document = _decode(fp.read, _read(fp.read, 1))
+        if fp.read(1):
+            raise ValueError("Extra data after the binary document")
+        return document
+
+    def dumps(self, data):
+        buf = bytearray()
+        _encode(buf, data)
+        return bytes(buf)
+
+    def load_stream(self, fp):
+        while True:
+            tag = fp.read(1)
+            if not tag:
+                return
+            yield _decode(fp.read, tag)
+
+    def dump_stream(self, documents, fp):
+        for document in documents:
+            fp.write(self.dumps(document))
+
+
+register_format(JsonFormat())
+register_format(YamlFormat())
+register_format(IniFormat())
+register_format(BinaryFormat())
+if importlib.util.find_spec("msgpack") is not None:
+    register_format(MsgPackFormat())
@@ -1,41 +1,88 @@
+import array
 import collections
 import contextlib
-import json
+import copy
 import pprint
 import threading
-import configparser
-import io
 import sys
+import weakref
 
 import marshmallow
 from marshmallow import fields
 
-try:
-    import yaml
-except ImportError:
-    pass
+from marshmallow_objects.formats import get_format
+from marshmallow_objects.profiling import profile_hook
 
 
 @marshmallow.post_load
 def __make_object__(self, data, **kwargs):
     data["many"] = kwargs.pop("many", None)
-    return self.__model_class__(__post_load__=True, __schema__=self, **data)
+    # the target of Model.load_into is set on the root schema for a single load
+    instance = self.__dict__.pop("__instance__", None)
+    return self.__model_class__(__post_load__=True, __schema__=self, __instance__=instance, **data)
+
+
+class _LazySchemaClass(object):
+    """A class level descriptor which builds the schema class on first access."""
+
+    def __init__(self, schema_class, schema_fields):
+        self.schema_class = schema_class
+        self.schema_fields = schema_fields
+
+    def __get__(self, instance, owner):
+        return ModelMeta.__build_schema_class__(owner)
+
+
+def _get_meta_option(dct, parents, name, default=None):
+    meta = dct.get("Meta")
+    if meta is None:
+        for parent in parents:
+            meta = getattr(parent, "Meta", None)
+            if meta is not None:
+                break
+    return getattr(meta, name, default)
+
+
+class _ModelSchemaMixin(object):
+    """The base of the schema classes built by ModelMeta.
+
+    The context is stored in a holder shared by a root schema and all its
+    nested schemas, so the nested models always see the context of the root
+    and setting it takes a constant time.
+    """
+
+    @property
+    def context(self):
+        return self.__context_ref__[0]
+
+    @context.setter
+    def context(self, value):
+        ref = self.__dict__.get("__context_ref__")
+        if ref is None:
+            self.__context_ref__ = [value]
+        else:
+            ref[0] = value
+
+    def get_attribute(self, obj, attr, default):
+        # the missing fields are skipped by checking the object's state instead of
+        # switching the object into a dump mode, so the dumps do not need any lock
+        if isinstance(obj, Model) and obj.__is_missing__(attr):
+            return marshmallow.missing
+        return super(_ModelSchemaMixin, self).get_attribute(obj, attr, default)
 
 
 class ModelMeta(type):
-    def __new__(mcs, name, parents, dct):
-        if "__schema_class__" not in dct:
-            dct["__schema_class__"] = None
-        cls = super(ModelMeta, mcs).__new__(mcs, name, parents, dct)
+    __schema_lock__ = threading.RLock()
+    __registry__ = weakref.WeakSet()
+    __registry_version__ = 0
 
+    def __new__(mcs, name, parents, dct):
         schema_fields = {
-            "__make_object__": __make_object__,
-            "__model_class__": cls,
+            "__make_object__": profile_hook(__make_object__),
         }
         for key, value in dct.items():
             if isinstance(value, fields.Field):
                 schema_fields[key] = value
-                setattr(cls, key, None)
                 if isinstance(value, fields.Method):
                     for method_name in (
                         value.serialize_method_name,
@@ -44,34 +91,120 @@ class ModelMeta(type):
                         if method_name is not None:
                             schema_fields[method_name] = dct[method_name]
 
-            elif hasattr(value, "__marshmallow_hook__") or key in ("Meta", "on_bind_field", "handle_error",):
+            elif hasattr(value, "__marshmallow_hook__"):
+                schema_fields[key] = profile_hook(value)
+            elif key in ("Meta", "on_bind_field", "handle_error",):
                 schema_fields[key] = value
 
-        parent_schemas = []
-        if parents:
-            for parent in parents:
-                if issubclass(parent, Model) and parent != Model:
-                    parent_schemas.append(parent.__schema_class__)
-        parent_schemas = parent_schemas or [cls.__schema_class__ or marshmallow.Schema]
-        schema_class = type(name + "Schema", tuple(parent_schemas), schema_fields)
-        cls.__schema_class__ = schema_class
+        field_names = [key for key, value in schema_fields.items() if isinstance(value, fields.Field)]
+        compact_parent = any(getattr(parent, "__compact__", False) for parent in parents)
+        compact = compact_parent or _get_meta_option(dct, parents, "compact", False)
+        if compact:
+            # the field values are stored in the slots, so the class attributes must be removed
+            slots = field_names
+            for key in field_names:
+                del dct[key]
+            if not compact_parent:
+                slots = slots + ["__schema__", "__missing_mask__"]
+                dct["__compact__"] = True
+                dct["__missing_lock__"] = threading.Lock()
+                parents = (_CompactModel,) + parents
+            dct["__slots__"] = tuple(slots)
+
+        frozen_parent = any(getattr(parent, "__frozen__", False) for parent in parents)
+        if not frozen_parent and _get_meta_option(dct, parents, "frozen", False):
+            if compact:
+                dct["__slots__"] += ("__hash_value__",)
+            dct["__frozen__"] = True
+            parents = (_FrozenModel,) + parents
+
+        pool_size = _get_meta_option(dct, parents, "pool_size", 0)
+        if pool_size and (frozen_parent or dct.get("__frozen__")):
+            raise ValueError("The frozen model '%s' cannot have a pool, its objects can be shared" % name)
+        # every class has its own pool or none, the subclasses must never reuse the objects of their parents
+        dct["__pool__"] = [] if pool_size else None
+        dct["__pool_size__"] = pool_size
+
+        dct["__schema_class__"] = _LazySchemaClass(dct.get("__schema_class__"), schema_fields)
+        cls = super(ModelMeta, mcs).__new__(mcs, name, parents, dct)
+        if not compact:
+            for key in field_names:
+                setattr(cls, key, None)
 
+        mcs.__registry__.add(cls)
+        ModelMeta.__registry_version__ += 1
         return cls
 
+    def __build_schema_class__(cls):
+        with ModelMeta.__schema_lock__:
+            lazy = cls.__dict__["__schema_class__"]
+            if not isinstance(lazy, _LazySchemaClass):
+                # has been built by another thread
+                return lazy
+
+            parent_schemas = []
+            for parent in cls.__bases__:
+                if issubclass(parent, Model) and parent != Model:
+                    parent_schemas.append(parent.__schema_class__)
+            parent_schemas = parent_schemas or [_ModelSchemaMixin, lazy.schema_class or marshmallow.Schema]
+            schema_fields = dict(lazy.schema_fields, __model_class__=cls)
+            schema_class = type(cls.__name__ + "Schema", tuple(parent_schemas), schema_fields)
+            if cls.__compact__:
+                field_bits = {name: 1 << index for index, name in enumerate(schema_class._declared_fields)}
+                type.__setattr__(cls, "__field_bits__", field_bits)
+                type.__setattr__(cls, "__fields_mask__", (1 << len(field_bits)) - 1)
+            type.__setattr__(cls, "__schema_class__", schema_class)
+            if cls.__frozen__:
+                try:
+                    # checked once the class is set, so the self nested models are resolved
+                    cls.__check_frozen_nested__(schema_class)
+                except ValueError:
+                    type.__setattr__(cls, "__schema_class__", lazy)
+                    raise
+            return schema_class
+
+    def __check_frozen_nested__(cls, schema_class):
+        for name, field in schema_class._declared_fields.items():
+            if isinstance(field, fields.List):
+                field = field.inner
+            if isinstance(field, PolymorphicNestedModel):
+                nested_model = field.base
+            elif isinstance(field, NestedModel):
+                nested = field.nested
+                if callable(nested) and not isinstance(nested, type):
+                    try:
+                        nested = nested()
+                    except marshmallow.ValidationError:
+                        # not defined yet
+                        continue
+                nested_model = getattr(nested, "__model_class__", None)
+            else:
+                continue
+            if nested_model is not None and not nested_model.__frozen__:
+                raise ValueError(
+                    "The frozen model '%s' cannot nest the model '%s' in '%s', it is not frozen"
+                    % (cls.__name__, nested_model.__name__, name)
+                )
+
     def __call__(cls, *args, **kwargs):
         if kwargs.pop("__post_load__", False):
             kwargs.pop("many", None)
             kwargs.pop("unknown", None)
             schema = kwargs.pop("__schema__")
-            obj = cls.__new__(cls, *args, **kwargs)
-            obj.__dump_lock__ = threading.RLock()
-            obj.__schema__ = schema
-            missing_fields = set(schema._declared_fields.keys())
-            for name, value in kwargs.items():
-                setattr(obj, name, value)
-                missing_fields.remove(name)
-            obj.__missing_fields__ = missing_fields
-            obj.__setattr_func__ = obj.__setattr_missing_fields__
+            obj = kwargs.pop("__instance__", None)
+            if obj is not None:
+                obj.__reset__()
+            else:
+                pool = cls.__pool__
+                if pool:
+                    try:
+                        obj = pool.pop()
+                    except IndexError:
+                        # emptied by another thread
+                        pass
+                if obj is None:
+                    obj = cls.__new__(cls, *args, **kwargs)
+            cls.__load_state__(obj, schema, kwargs)
             obj.__init__(*args, **kwargs)
         else:
             context = kwargs.pop("context", None)
@@ -93,20 +226,204 @@ def _find_nested(nested):
     return func
 
 
+def _nested_schema_class(nested):
+    def func():
+        return nested.__schema_class__
+
+    return func
+
+
+def _share_context(field, schema):
+    # the nested schema is bound to the schema owning the field, even through the containers
+    ref = getattr(getattr(field, "root", None), "__context_ref__", None)
+    if ref is not None and isinstance(schema, _ModelSchemaMixin):
+        schema.__context_ref__ = ref
+        schema.__context_shared__ = True
+    return schema
+
+
+def _bind_model(obj, schema):
+    # the frozen objects can be shared between several trees, so they keep their own context
+    if obj.__schema__ is schema or obj.__frozen__ or getattr(schema, "__model_class__", None) is not obj.__class__:
+        return
+    object.__setattr__(obj, "__schema__", schema)
+    for name, field in schema.fields.items():
+        _bind_value(getattr(obj, name, None), field)
+
+
+def _bind_value(value, field):
+    """Bind the models set to a nested field to the nested schema, so they share the context of the parent."""
+    inner = field.inner if isinstance(field, fields.List) else field
+    if not isinstance(inner, (NestedModel, PolymorphicNestedModel)):
+        return
+    if isinstance(value, Model):
+        _bind_model(value, _nested_schema(field, value))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            if isinstance(item, Model):
+                _bind_model(item, _nested_schema(field, item))
+
+
 class NestedModel(fields.Nested):
     def __init__(self, nested, **kwargs):
         if isinstance(nested, str):
             schema_class = _find_nested(nested)
         else:
-            schema_class = nested.__schema_class__
+            schema_class = _nested_schema_class(nested)
         super(NestedModel, self).__init__(schema_class, **kwargs)
 
+    @property
+    def schema(self):
+        if self._schema:
+            return self._schema
+        return _share_context(self, super(NestedModel, self).schema)
+
     def _deserialize(self, value, attr, data, **kwargs):
-        if self.many and value and isinstance(value[0], Model):
+        if (self.many and value and isinstance(value[0], Model)) or isinstance(value, Model):
+            _bind_value(value, self)
             return value
+        return super(NestedModel, self)._deserialize(value, attr, data, **kwargs)
+
+
+# the indexes keep weak references only, so the models defined at runtime can be freed
+_polymorphic_indexes = weakref.WeakKeyDictionary()
+
+
+def _polymorphic_index(base, discriminator):
+    version = ModelMeta.__registry_version__
+    indexes = _polymorphic_indexes.setdefault(base, {})
+    cached = indexes.get(discriminator)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    candidates = {}
+    for model_class in list(ModelMeta.__registry__):
+        if not issubclass(model_class, base):
+            continue
+        field = model_class.__schema_class__._declared_fields.get(discriminator)
+        if isinstance(field, fields.Constant):
+            try:
+                candidates.setdefault(field.constant, []).append(model_class)
+            except TypeError:
+                # unhashable constants can never match
+                pass
+    index = {}
+    for value, model_classes in candidates.items():
+        # the subclasses inheriting the value of their parents are not candidates of their own,
+        # several unrelated models are kept to report the ambiguous values when loading
+        roots = [
+            model_class
+            for model_class in model_classes
+            if not any(other is not model_class and issubclass(model_class, other) for other in model_classes)
+        ]
+        index[value] = tuple(weakref.ref(model_class) for model_class in roots)
+    indexes[discriminator] = (version, index)
+    return index
+
+
+class PolymorphicNestedModel(fields.Field):
+    """A nested model which class is selected by a discriminator key of the data.
+
+    The candidates are the subclasses of the base model declaring the
+    discriminator as a `fields.Constant`. The index of the constants is built
+    from the registry of the models and rebuilt only when a new model is
+    defined. Every element of a list is loaded and dumped with the cached
+    schema of its own class, and the errors are collected in a single pass.
+
+        class Shape(marshmallow.Model):
+            type = marshmallow.fields.Str()
+
+        class Circle(Shape):
+            type = marshmallow.fields.Constant("circle")
+            radius = marshmallow.fields.Float()
+
+        class Drawing(marshmallow.Model):
+            shapes = PolymorphicNestedModel(Shape, discriminator="type", many=True)
+    """
+
+    default_error_messages = {
+        "type": "Invalid input type.",
+        "discriminator": "Unknown {discriminator} {value!r}.",
+        "ambiguous": "Ambiguous {discriminator} {value!r}, shared by {models}.",
+    }
+
+    def __init__(self, base, discriminator="type", many=False, unknown=None, **kwargs):
+        self.base = base
+        self.discriminator = discriminator
+        self.many = many
+        self.unknown = unknown
+        self.__unknown__ = None
+        self.__schemas__ = {}
+        super(PolymorphicNestedModel, self).__init__(**kwargs)
+
+    @property
+    def model_classes(self):
+        """The mapping of the discriminator values to the model classes, without the ambiguous values."""
+        model_classes = {}
+        for value, refs in _polymorphic_index(self.base, self.discriminator).items():
+            if len(refs) == 1 and refs[0]() is not None:
+                model_classes[value] = refs[0]()
+        return model_classes
+
+    def get_schema(self, model_class):
+        schema = self.__schemas__.get(model_class)
+        if schema is None:
+            schema = _share_context(self, model_class.__get_schema_class__())
+            if self.unknown:
+                schema.unknown = self.unknown
+            if self.__unknown__:
+                Model._override_unknown(schema, self.__unknown__)
+            self.__schemas__[model_class] = schema
+        return schema
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        if self.many:
+            return [self.get_schema(item.__class__).dump(item) for item in value]
+        return self.get_schema(value.__class__).dump(value)
+
+    def _deserialize(self, value, attr, data, partial=None, **kwargs):
+        if not self.many:
+            return self._load_one(value, partial)
+        if not isinstance(value, (list, tuple)):
+            raise self.make_error("type")
+        result = []
+        errors = {}
+        for index, item in enumerate(value):
+            try:
+                result.append(self._load_one(item, partial))
+            except marshmallow.ValidationError as exc:
+                errors[index] = exc.messages
+        if errors:
+            raise marshmallow.ValidationError(errors, valid_data=result)
+        return result
+
+    def _load_one(self, value, partial):
         if isinstance(value, Model):
+            _bind_value(value, self)
             return value
-        return super(NestedModel, self)._deserialize(value, attr, data, **kwargs)
+        if not isinstance(value, collections.abc.Mapping):
+            raise self.make_error("type")
+        type_value = value.get(self.discriminator)
+        try:
+            refs = _polymorphic_index(self.base, self.discriminator).get(type_value, ())
+        except TypeError:
+            # unhashable values
+            refs = ()
+        model_classes = [model_class for model_class in (ref() for ref in refs) if model_class is not None]
+        if len(model_classes) != 1:
+            if model_classes:
+                models = ", ".join(sorted(model_class.__name__ for model_class in model_classes))
+                message = self.error_messages["ambiguous"].format(
+                    discriminator=self.discriminator, value=type_value, models=models
+                )
+            else:
+                message = self.error_messages["discriminator"].format(
+                    discriminator=self.discriminator, value=type_value
+                )
+            raise marshmallow.ValidationError({self.discriminator: [message]})
+        return self.get_schema(model_classes[0]).load(value, partial=partial)
 
 
 def with_metaclass(meta, *bases):
@@ -122,63 +439,256 @@ def with_metaclass(meta, *bases):
     return type.__new__(metaclass, "temporary_class", (), {})
 
 
+class _CompactModel(object):
+    """Stores the field values in slots and the missing fields as a bitmask.
+
+    The mixin is added by ModelMeta to the models having `compact = True` in
+    their Meta options. Only the first write of a missing field takes the lock
+    shared by all instances of the class, to not lose concurrent bitmask updates.
+    """
+
+    __slots__ = ()
+
+    def __load_state__(self, schema, data):
+        field_bits = self.__field_bits__
+        missing_mask = self.__fields_mask__
+        for name, value in data.items():
+            object.__setattr__(self, name, value)
+            missing_mask &= ~field_bits[name]
+        for name, bit in field_bits.items():
+            if missing_mask & bit:
+                object.__setattr__(self, name, None)
+        object.__setattr__(self, "__schema__", schema)
+        object.__setattr__(self, "__missing_mask__", missing_mask)
+
+    def __reset__(self):
+        # the slots are kept, so a pooled object is reused without any allocation
+        for name in self.__field_bits__:
+            object.__setattr__(self, name, None)
+        object.__setattr__(self, "__schema__", None)
+        object.__setattr__(self, "__missing_mask__", self.__fields_mask__)
+
+    def __setattr__(self, key, value):
+        bit = self.__field_bits__.get(key)
+        if bit is not None and self.__missing_mask__ & bit:
+            with self.__missing_lock__:
+                object.__setattr__(self, "__missing_mask__", self.__missing_mask__ & ~bit)
+        object.__setattr__(self, key, value)
+        if isinstance(value, (Model, list)):
+            self.__bind_field__(key, value)
+
+    def __is_missing__(self, name):
+        bit = self.__field_bits__.get(name)
+        return bit is not None and self.__missing_mask__ & bit != 0
+
+    @property
+    def __missing_fields__(self):
+        missing_mask = self.__missing_mask__
+        return {name for name, bit in self.__field_bits__.items() if missing_mask & bit}
+
+
+def _is_ndarray(value):
+    # numpy is never imported here, its arrays can exist only if it has been imported already
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _values_equal(value, other):
+    if _is_ndarray(value) or _is_ndarray(other):
+        return bool(sys.modules["numpy"].array_equal(value, other))
+    return value == other
+
+
+class _FrozenDict(dict):
+    """A dict rejecting any changes, the dict values of the frozen models."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("The values of a frozen model cannot be changed")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return _FrozenDict, (dict(self),)
+
+
+def _immutable_value(value):
+    if isinstance(value, (list, tuple, array.array)):
+        return tuple(_immutable_value(item) for item in value)
+    if isinstance(value, dict):
+        return _FrozenDict((key, _immutable_value(item)) for key, item in value.items())
+    if isinstance(value, set):
+        return frozenset(value)
+    if _is_ndarray(value):
+        view = value.view()
+        view.setflags(write=False)
+        return view
+    return value
+
+
+def _freeze_value(value):
+    if isinstance(value, (list, tuple, array.array)):
+        return tuple(_freeze_value(item) for item in value)
+    if _is_ndarray(value):
+        return tuple(value.tolist())
+    if isinstance(value, dict):
+        return frozenset((key, _freeze_value(item)) for key, item in value.items())
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _nested_schema(field, value):
+    if isinstance(field, fields.List):
+        field = field.inner
+    if isinstance(field, PolymorphicNestedModel):
+        return field.get_schema(value.__class__)
+    if isinstance(field, NestedModel):
+        return field.schema
+    return None
+
+
+def _clone_value(value, field=None):
+    if isinstance(value, Model):
+        return value.__clone__(_nested_schema(field, value))
+    if isinstance(value, list):
+        return [_clone_value(item, field) for item in value]
+    if isinstance(value, dict):
+        return {key: _clone_value(item) for key, item in value.items()}
+    if isinstance(value, set):
+        return set(value)
+    if isinstance(value, array.array):
+        return array.array(value.typecode, value)
+    if _is_ndarray(value):
+        return value.copy()
+    return value
+
+
+class _FrozenModel(object):
+    """Rejects any writes after the object has been loaded.
+
+    The mixin is added by ModelMeta to the models having `frozen = True` in
+    their Meta options. The lists, dicts and sets are stored as immutable
+    copies and the nested models must be frozen too, so the frozen objects
+    are hashable and can be shared between threads without any locks.
+    """
+
+    __slots__ = ()
+
+    def __load_state__(self, schema, data):
+        # the containers are replaced by immutable copies, so the cached hash stays valid
+        data = {name: _immutable_value(value) for name, value in data.items()}
+        super(_FrozenModel, self).__load_state__(schema, data)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Cannot assign '%s', the model '%s' is frozen" % (key, self.__class__.__name__))
+
+    def __delattr__(self, key):
+        raise AttributeError("Cannot delete '%s', the model '%s' is frozen" % (key, self.__class__.__name__))
+
+    def __hash__(self):
+        hash_value = getattr(self, "__hash_value__", None)
+        if hash_value is None:
+            values = tuple(_freeze_value(getattr(self, key)) for key in self.__schema__.fields)
+            hash_value = hash((self.__class__, values))
+            object.__setattr__(self, "__hash_value__", hash_value)
+        return hash_value
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, self.__class__):
+            return False
+        hash_value = getattr(self, "__hash_value__", None)
+        other_hash_value = getattr(other, "__hash_value__", None)
+        if hash_value is not None and other_hash_value is not None and hash_value != other_hash_value:
+            return False
+        return super(_FrozenModel, self).__eq__(other)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def load_into(self, data, context=None, partial=None, unknown=None):
+        raise AttributeError("Cannot load into the model '%s', it is frozen" % self.__class__.__name__)
+
+    def release(self):
+        # the frozen objects can be shared, so they are never recycled
+        pass
+
+
 class Model(with_metaclass(ModelMeta)):
+    __slots__ = ()
     __schema_class__ = marshmallow.Schema
     __schema__ = None
     __missing_fields__ = None
-    __dump_mode__ = False
-    __dump_lock__ = None
+    __compact__ = False
+    __frozen__ = False
+    __pool__ = None
+    __pool_size__ = 0
 
     @classmethod
     def __get_schema_class__(cls, **kwargs):
         return cls.__schema_class__(**kwargs)
 
-    def __setattr_default__(self, key, value):
-        super(Model, self).__setattr__(key, value)
+    @classmethod
+    def warm_up(cls):
+        """Build the schema classes of the model and all its nested models.
+
+        The schema classes are built on first use by default, so the servers
+        preferring to do the work at startup can call this method explicitly.
+        """
+        seen = set()
+        pending = [cls.__schema_class__]
+        while pending:
+            schema_class = pending.pop()
+            if schema_class in seen:
+                continue
+            seen.add(schema_class)
+            for field in schema_class._declared_fields.values():
+                if isinstance(field, fields.List):
+                    field = field.inner
+                if isinstance(field, PolymorphicNestedModel):
+                    pending.extend(model_class.__schema_class__ for model_class in field.model_classes.values())
+                elif isinstance(field, fields.Nested):
+                    nested = field.nested
+                    if callable(nested) and not isinstance(nested, type):
+                        nested = nested()
+                    if isinstance(nested, type):
+                        pending.append(nested)
+        return cls
 
-    __setattr_func__ = __setattr_default__
+    def __load_state__(self, schema, data):
+        object.__setattr__(self, "__schema__", schema)
+        missing_fields = set(schema._declared_fields.keys())
+        for name, value in data.items():
+            object.__setattr__(self, name, value)
+            missing_fields.remove(name)
+        object.__setattr__(self, "__missing_fields__", missing_fields)
 
-    def __setattr__(self, key, value):
-        self.__setattr_func__(key, value)
+    def __reset__(self):
+        self.__dict__.clear()
 
-    def __setattr_missing_fields__(self, key, value):
-        with self.__dump_lock__:
-            if key in self.__missing_fields__:
-                self.__missing_fields__.remove(key)
+    def __setattr__(self, key, value):
+        missing_fields = self.__missing_fields__
+        if missing_fields and key in missing_fields:
+            # set.discard is atomic, so the writes do not need any lock
+            missing_fields.discard(key)
         super(Model, self).__setattr__(key, value)
+        if isinstance(value, (Model, list)):
+            self.__bind_field__(key, value)
 
-    def __getattribute__(self, item):
-        if object.__getattribute__(self, "__dump_mode__"):
-            if item in object.__getattribute__(self, "__missing_fields__"):
-                return marshmallow.missing
-        return object.__getattribute__(self, item)
-
-    def __propagate_dump_mode__(self, value):
-        self.__dump_mode__ = value
-        for name, field in self.__schema__.fields.items():
-            if isinstance(field, fields.List):
-                field = field.inner
-            if isinstance(field, fields.Nested):
-                nested = getattr(self, name, None)
-                if nested is not None and nested != marshmallow.missing:
-                    if isinstance(nested, list):
-                        for sub_nested in nested:
-                            if sub_nested is not None and sub_nested != marshmallow.missing:
-                                sub_nested.__propagate_dump_mode__(value)
-                    else:
-                        nested.__propagate_dump_mode__(value)
+    def __bind_field__(self, key, value):
+        schema = self.__schema__
+        field = schema.fields.get(key) if schema is not None else None
+        if field is not None:
+            _bind_value(value, field)
 
-    @contextlib.contextmanager
-    def __dump_mode_on__(self):
-        with self.__dump_lock__:
-            if self.__dump_mode__:
-                yield
-            else:
-                try:
-                    self.__propagate_dump_mode__(True)
-                    yield
-                finally:
-                    self.__propagate_dump_mode__(False)
+    def __is_missing__(self, name):
+        missing_fields = self.__missing_fields__
+        return missing_fields is not None and name in missing_fields
 
     def __init__(self, context=None, partial=None, **kwargs):
         pass
@@ -189,11 +699,13 @@ class Model(with_metaclass(ModelMeta)):
 
     @context.setter
     def context(self, value):
-        for name in self.__schema__.fields:
-            attr = getattr(self, name)
-            if isinstance(attr, Model):
-                attr.context = value
-        self.__schema__.context = value
+        schema = self.__schema__
+        if schema.__dict__.get("__context_shared__"):
+            # a nested model gets its own context instead of changing the context of its parent
+            _bind_model(self, self.__get_schema_class__(context=value))
+        else:
+            # shared with all the nested models
+            schema.context = value
 
     @classmethod
     def _override_unknown(cls, schema, unknown):
@@ -202,6 +714,11 @@ class Model(with_metaclass(ModelMeta)):
         for field in schema.fields.values():
             if isinstance(field, fields.Nested):
                 cls._override_unknown(field.schema, unknown)
+            elif isinstance(field, PolymorphicNestedModel):
+                # the schemas of the other classes are overridden when created
+                field.__unknown__ = unknown
+                for nested_schema in field.__schemas__.values():
+                    cls._override_unknown(nested_schema, unknown)
 
     @classmethod
     def _restore_unknown(cls, schema):
@@ -211,6 +728,10 @@ class Model(with_metaclass(ModelMeta)):
         for field in schema.fields.values():
             if isinstance(field, fields.Nested):
                 cls._restore_unknown(field.schema)
+            elif isinstance(field, PolymorphicNestedModel):
+                field.__unknown__ = None
+                for nested_schema in field.__schemas__.values():
+                    cls._restore_unknown(nested_schema)
 
     @classmethod
     @contextlib.contextmanager
@@ -229,50 +750,164 @@ class Model(with_metaclass(ModelMeta)):
             loaded = schema.load(data, many=many)
         return loaded
 
+    def load_into(self, data, context=None, partial=None, unknown=None):
+        """Load the data into the object itself instead of allocating a new one.
+
+        All the fields are replaced, the fields missing in the data are reset.
+        The object is left untouched if the data is not valid. The context of
+        the object is kept if no other context is given.
+        """
+        if context is None and self.__schema__ is not None:
+            context = self.__schema__.context
+        schema = self.__get_schema_class__(context=context, partial=partial)
+        schema.__instance__ = self
+        try:
+            with self.propagate_unknwown(schema, unknown):
+                return schema.load(data)
+        finally:
+            schema.__dict__.pop("__instance__", None)
+
+    def release(self):
+        """Return the object and its nested models to the pools of their classes.
+
+        The pools are enabled by the `pool_size` Meta option, the next loads
+        reuse the released objects instead of allocating new ones. The object
+        must not be used after the release. The models without a pool are
+        left as is, only their nested models are released.
+        """
+        schema = self.__schema__
+        if schema is None:
+            # has already been released
+            return
+        for name in schema.fields:
+            value = getattr(self, name, None)
+            if isinstance(value, Model):
+                value.release()
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, Model):
+                        item.release()
+        pool = self.__pool__
+        if pool is not None and len(pool) < self.__pool_size__:
+            self.__reset__()
+            pool.append(self)
+
     def dump(self):
-        with self.__dump_mode_on__():
-            dump = self.__schema__.dump(self)
-            return dump
+        return self.__schema__.dump(self)
+
+    @classmethod
+    def load_format(
+        cls, format, data, context=None, many=None, partial=None, unknown=None, *args, cache=None, **kwargs
+    ):
+        if cache is not None:
+            return cache.load(cls, format, data, context, many, partial, unknown, *args, **kwargs)
+        loaded = get_format(format).loads(data, *args, **kwargs)
+        return cls.load(loaded, context=context, many=many, partial=partial, unknown=unknown)
+
+    def dump_format(self, format, *args, **kwargs):
+        return get_format(format).dumps(self.dump(), *args, **kwargs)
+
+    @classmethod
+    def load_stream(cls, format, fp, context=None, many=None, partial=None, unknown=None, *args, **kwargs):
+        """Load the documents from a file object one by one and yield the models."""
+        schema = cls.__get_schema_class__(context=context, partial=partial)
+        with cls.propagate_unknwown(schema, unknown):
+            for document in get_format(format).load_stream(fp, *args, **kwargs):
+                yield schema.load(document, many=many)
 
     @classmethod
     def load_json(cls, data, context=None, many=None, partial=None, unknown=None, *args, **kwargs):
-        schema = cls.__get_schema_class__(context=context)
-        loaded = schema.loads(data, many=many, partial=partial, unknown=unknown, *args, **kwargs)
-        return loaded
+        kwargs.setdefault("render_module", cls.__schema_class__.opts.render_module)
+        return cls.load_format("json", data, context, many, partial, unknown, *args, **kwargs)
 
     def dump_json(self):
-        return json.dumps(self.dump())
+        return self.dump_format("json")
+
+    @classmethod
+    def load_json_iter(cls, fp, context=None, partial=None, unknown=None, chunk_size=65536):
+        """Parse a top level JSON array from a file object and yield the models one by one.
+
+        Unlike `load_json(data, many=True)`, only one element of the array is
+        kept in memory at a time. The validation errors are keyed by the index
+        of the invalid element, like the errors of `load(data, many=True)`.
+        """
+        schema = cls.__get_schema_class__(context=context, partial=partial)
+        with cls.propagate_unknwown(schema, unknown):
+            for index, document in enumerate(get_format("json").load_array(fp, chunk_size)):
+                try:
+                    yield schema.load(document)
+                except marshmallow.ValidationError as exc:
+                    raise marshmallow.ValidationError({index: exc.messages}, data=document, valid_data=exc.valid_data)
 
     @classmethod
     def load_yaml(cls, data, context=None, many=None, partial=None, unknown=None, *args, **kwargs):
-        loaded = yaml.load(data, Loader=yaml.FullLoader)
-        return cls.load(loaded, context=context, many=many, partial=partial, unknown=unknown,)
+        return cls.load_format("yaml", data, context, many, partial, unknown, *args, **kwargs)
 
     def dump_yaml(self, default_flow_style=False):
-        return yaml.dump(self.dump(), default_flow_style=default_flow_style)
+        return self.dump_format("yaml", default_flow_style=default_flow_style)
 
     @classmethod
     def load_ini(cls, data, context=None, partial=None, **kwargs):
-        parser = configparser.ConfigParser(**kwargs)
-        parser.read_string(data)
-        ddata = {s: dict(parser.items(s)) for s in parser.sections()}
-        ddata.update(parser.defaults())
-        return cls.load(ddata, context=context, partial=partial)
+        return cls.load_format("ini", data, context=context, partial=partial, **kwargs)
 
     def dump_ini(self, **kwargs):
-        data = {}
-        default_data = {}
-        for key, value in self.dump().items():
-            if isinstance(value, dict):
-                data[key] = value
+        return self.dump_format("ini", **kwargs)
+
+    def update(self, data, partial=True, unknown=None):
+        """Validate the given data and set the fields in place.
+
+        Only the fields present in the data are deserialized and validated,
+        the nested models are updated recursively instead of being replaced.
+        Nothing is changed if the validation fails.
+        """
+        for obj, name, value in self.__prepare_update__(data, partial, unknown):
+            setattr(obj, name, value)
+        return self
+
+    def __prepare_update__(self, data, partial, unknown):
+        if self.__frozen__:
+            raise AttributeError("Cannot update, the model '%s' is frozen" % self.__class__.__name__)
+        schema = self.__get_schema_class__()
+        # the new nested models share the context of the object
+        schema.__context_ref__ = self.__schema__.__context_ref__
+        load_fields = {}
+        for name, field in schema.load_fields.items():
+            load_fields[field.data_key if field.data_key is not None else name] = field
+
+        changes = []
+        errors = {}
+        flat_data = {}
+        nested_names = []
+        for key, value in data.items():
+            field = load_fields.get(key)
+            if isinstance(field, NestedModel) and not field.many and isinstance(value, collections.abc.Mapping):
+                nested = getattr(self, field.attribute or field.name)
+                if isinstance(nested, Model):
+                    nested_names.append(field.name)
+                    try:
+                        changes.extend(nested.__prepare_update__(value, partial, unknown))
+                    except marshmallow.ValidationError as exc:
+                        errors[key] = exc.messages
+                    continue
+            flat_data[key] = value
+
+        if not partial:
+            # the nested models being updated in place must not be reported as missing
+            partial = tuple(nested_names)
+        try:
+            with self.propagate_unknwown(schema, unknown):
+                loaded = schema._do_load(flat_data, partial=partial, postprocess=False)
+        except marshmallow.ValidationError as exc:
+            if isinstance(exc.messages, dict):
+                errors.update(exc.messages)
             else:
-                default_data[key] = value
-        kwargs["defaults"] = default_data
-        parser = configparser.ConfigParser(**kwargs)
-        parser._sections = data
-        fp = io.StringIO()
-        parser.write(fp)
-        return fp.getvalue().strip()
+                errors[marshmallow.exceptions.SCHEMA] = exc.messages
+        else:
+            changes.extend((self, name, value) for name, value in loaded.items())
+
+        if errors:
+            raise marshmallow.ValidationError(errors, data=data)
+        return changes
 
     @classmethod
     def validate(cls, data, context=None, many=None, partial=None):
@@ -285,15 +920,35 @@ class Model(with_metaclass(ModelMeta)):
 
     def __deepcopy__(self, memo):
         """A magic method to implement deep copy behavior."""
-        obj = self.__class__.load(self.dump(), context=self.context.copy())
+        obj = self.__class__.load(self.dump(), context=copy.deepcopy(self.context, memo))
         memo[id(obj)] = obj
         return obj
 
+    def __clone__(self, schema=None):
+        """Copy the object and its nested models without dumping and loading them.
+
+        The copy gets a new schema with a copy of the context, the nested
+        models are bound to the nested schemas of the new one.
+        """
+        cls = self.__class__
+        if schema is None:
+            schema = cls.__get_schema_class__(context=dict(self.context))
+        data = {}
+        for name, field in schema.fields.items():
+            if not self.__is_missing__(name):
+                data[name] = _clone_value(getattr(self, name), field)
+        obj = cls.__new__(cls)
+        cls.__load_state__(obj, schema, data)
+        obj.__init__(**data)
+        return obj
+
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, self.__class__):
             return False
         for key in self.__schema__.fields.keys():
-            if getattr(self, key) != getattr(other, key):
+            if not _values_equal(getattr(self, key), getattr(other, key)):
                 return False
         return True
 
@@ -304,31 +959,44 @@ class Model(with_metaclass(ModelMeta)):
         return pprint.pformat(self.dump())
 
 
-def dump_many(data, context=None):
-    ret = []
-    for obj in data:
-        if isinstance(obj, Model):
-            if context is None:
-                schema = obj.__schema__
-            else:
-                schema = obj.__get_schema_class__(context=context)
-            obj_data = schema.dump(obj)
-            ret.append(obj_data)
-        elif isinstance(obj, collections.abc.Sequence) and not isinstance(obj, str):
-            ret.append(dump_many(obj, context=context))
+def _dump_object(obj, data, context):
+    if isinstance(obj, Model):
+        if context is None:
+            schema = obj.__schema__
         else:
-            raise marshmallow.ValidationError(
-                "The object '%s' is not an instance of Model class" % obj, data=data,
-            )
+            schema = obj.__get_schema_class__(context=context)
+        return schema.dump(obj)
+    elif isinstance(obj, collections.abc.Sequence) and not isinstance(obj, str):
+        return dump_many(obj, context=context)
+    raise marshmallow.ValidationError(
+        "The object '%s' is not an instance of Model class" % obj, data=data,
+    )
+
 
-    return ret
+def dump_many(data, context=None):
+    return [_dump_object(obj, data, context) for obj in data]
 
 
-def dump_many_json(data, context=None, *args, **kwargs):
+def dump_many_format(format, data, context=None, *args, **kwargs):
     ret = dump_many(data, context)
-    return json.dumps(ret, *args, **kwargs)
+    return get_format(format).dumps(ret, *args, **kwargs)
+
+
+def dump_stream(format, data, fp, context=None, *args, **kwargs):
+    """Dump the objects to a file object one by one, each object as a separate document."""
+    documents = (_dump_object(obj, data, context) for obj in data)
+    get_format(format).dump_stream(documents, fp, *args, **kwargs)
+
+
+def dump_many_json(data, context=None, *args, **kwargs):
+    return dump_many_format("json", data, context, *args, **kwargs)
 
 
 def dump_many_yaml(data, context=None, default_flow_style=False, *args, **kwargs):
-    ret = dump_many(data, context)
-    return yaml.dump(ret, default_flow_style=default_flow_style, *args, **kwargs)
+    return dump_many_format("yaml", data, context, default_flow_style, *args, **kwargs)
+
+
+def compile_all():
+    """Build the schema classes of all the defined models."""
+    for model_class in list(ModelMeta.__registry__):
+        model_class.__schema_class__
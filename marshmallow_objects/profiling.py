@@ -0,0 +1,177 @@
+import functools
+import sys
+import threading
+import time
+
+import marshmallow
+from marshmallow import fields
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+_field_serialize = fields.Field.serialize
+_field_deserialize = fields.Field.deserialize
+_schema_dump = marshmallow.Schema.dump
+_schema_do_load = marshmallow.Schema._do_load
+
+
+def _schema_name(schema):
+    model_class = getattr(schema, "__model_class__", None)
+    if model_class is not None:
+        return model_class.__name__
+    return schema.__class__.__name__
+
+
+def _field_names(field):
+    name = field.name
+    parent = field.parent
+    # the inner fields of the containers are bound to the container field
+    while isinstance(parent, fields.Field):
+        name = "%s[]" % parent.name
+        parent = parent.parent
+    return _schema_name(parent) if parent is not None else "-", name
+
+
+def profile_hook(func):
+    """Wrap a schema hook to record its calls while a profiler is active."""
+
+    @functools.wraps(func)
+    def wrapper(schema, *args, **kwargs):
+        profiler = _profiler
+        if profiler is None:
+            return func(schema, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(schema, *args, **kwargs)
+        finally:
+            profiler.add(_schema_name(schema), func.__name__, "hook", time.perf_counter() - start)
+
+    return wrapper
+
+
+def _profiled_serialize(self, *args, **kwargs):
+    profiler = _profiler
+    if profiler is None:
+        return _field_serialize(self, *args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return _field_serialize(self, *args, **kwargs)
+    finally:
+        profiler.add(*_field_names(self), operation="dump", elapsed=time.perf_counter() - start)
+
+
+def _profiled_deserialize(self, *args, **kwargs):
+    profiler = _profiler
+    if profiler is None:
+        return _field_deserialize(self, *args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return _field_deserialize(self, *args, **kwargs)
+    finally:
+        profiler.add(*_field_names(self), operation="load", elapsed=time.perf_counter() - start)
+
+
+def _profiled_dump(self, *args, **kwargs):
+    profiler = _profiler
+    if profiler is None:
+        return _schema_dump(self, *args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return _schema_dump(self, *args, **kwargs)
+    finally:
+        profiler.add(_schema_name(self), "*", "dump", time.perf_counter() - start)
+
+
+def _profiled_do_load(self, *args, **kwargs):
+    profiler = _profiler
+    if profiler is None:
+        return _schema_do_load(self, *args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return _schema_do_load(self, *args, **kwargs)
+    finally:
+        operation = "load" if kwargs.get("postprocess", True) else "validate"
+        profiler.add(_schema_name(self), "*", operation, time.perf_counter() - start)
+
+
+class Profiler(object):
+    """Record the calls and the time spent per model, field and hook.
+
+    The profiler is a context manager, all the loads, dumps and validations
+    done by any thread inside the block are recorded. The times are
+    inclusive: the time of a nested field contains the time of the nested
+    model, and the time of a model contains the time of its fields and hooks.
+
+        with Profiler() as profiler:
+            Album.load_json(data)
+        profiler.print_report()
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def add(self, model, target, operation, elapsed):
+        key = (model, target, operation)
+        with self._lock:
+            stat = self.stats.get(key)
+            if stat is None:
+                self.stats[key] = [1, elapsed]
+            else:
+                stat[0] += 1
+                stat[1] += elapsed
+
+    def __enter__(self):
+        global _profiler
+        with _profiler_lock:
+            if _profiler is not None:
+                raise RuntimeError("Another profiler is already active")
+            _profiler = self
+            fields.Field.serialize = _profiled_serialize
+            fields.Field.deserialize = _profiled_deserialize
+            marshmallow.Schema.dump = _profiled_dump
+            marshmallow.Schema._do_load = _profiled_do_load
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _profiler
+        with _profiler_lock:
+            fields.Field.serialize = _field_serialize
+            fields.Field.deserialize = _field_deserialize
+            marshmallow.Schema.dump = _schema_dump
+            marshmallow.Schema._do_load = _schema_do_load
+            _profiler = None
+
+    def ranking(self):
+        """Return the (model, target, operation, calls, seconds) records sorted by the time."""
+        with self._lock:
+            records = [key + tuple(stat) for key, stat in self.stats.items()]
+        return sorted(records, key=lambda record: record[4], reverse=True)
+
+    def report(self, limit=None):
+        lines = ["%10s %8s %12s  %-20s %-20s %s" % ("total ms", "calls", "per call us", "model", "target", "operation")]
+        for model, target, operation, calls, elapsed in self.ranking()[:limit]:
+            lines.append(
+                "%10.3f %8d %12.2f  %-20s %-20s %s"
+                % (elapsed * 1000, calls, elapsed * 1000000 / calls, model, target, operation)
+            )
+        return "\n".join(lines)
+
+    def print_report(self, limit=None, file=None):
+        print(self.report(limit), file=file or sys.stderr)
+
+
+def profile(func=None, limit=20, file=None):
+    """A decorator profiling every call of the function and printing the report afterwards."""
+    if func is None:
+        return functools.partial(profile, limit=limit, file=file)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with Profiler() as profiler:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.print_report(limit, file)
+
+    return wrapper
@@ -0,0 +1,187 @@
+import array
+import copy
+import json
+import math
+import unittest
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from marshmallow import validate
+
+import marshmallow_objects as marshmallow
+
+
+class Series(marshmallow.Model):
+    name = marshmallow.fields.Str()
+    values = marshmallow.NumericArray("d", min=0, max=100, use_numpy=False)
+    counts = marshmallow.NumericArray("i", use_numpy=False, allow_none=True)
+
+
+class FrozenSeries(marshmallow.Model):
+    values = marshmallow.NumericArray("d", use_numpy=False)
+
+    class Meta:
+        frozen = True
+
+
+class TestNumericArray(unittest.TestCase):
+    def test_load(self):
+        obj = Series(name="temperature", values=[1, 2.5, 3], counts=[1, 2])
+        self.assertEqual(array.array("d", [1, 2.5, 3]), obj.values)
+        self.assertEqual(array.array("i", [1, 2]), obj.counts)
+
+    def test_dump(self):
+        obj = Series(values=array.array("d", [1.5]), counts=None)
+        self.assertEqual({"values": [1.5], "counts": None}, obj.dump())
+        self.assertEqual({"values": [1.5], "counts": None}, json.loads(obj.dump_json()))
+
+    def test_empty(self):
+        self.assertEqual({"values": []}, Series(values=[]).dump())
+
+    def test_range(self):
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            Series(values=[1, -1])
+        self.assertEqual({"values": ["Must be greater than or equal to 0."]}, exc.exception.messages)
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            Series(values=[1, 101])
+        self.assertEqual({"values": ["Must be less than or equal to 100."]}, exc.exception.messages)
+
+    def test_invalid(self):
+        for values in ("123", [1, "a"], [[1]], {"a": 1}, 1):
+            with self.assertRaises(marshmallow.ValidationError) as exc:
+                Series(values=values)
+            self.assertEqual({"values": ["Not a valid numeric array."]}, exc.exception.messages)
+        with self.assertRaises(marshmallow.ValidationError):
+            Series(counts=[1.5])
+        with self.assertRaises(marshmallow.ValidationError):
+            Series(counts=[2 ** 40])
+
+    def test_special(self):
+        for values in ([1, float("nan")], [float("inf")], [-float("inf"), 1]):
+            with self.assertRaises(marshmallow.ValidationError) as exc:
+                Series(values=values)
+            self.assertEqual(
+                {"values": ["Special numeric values (nan or infinity) are not permitted."]}, exc.exception.messages
+            )
+        field = marshmallow.NumericArray("d", allow_nan=True, use_numpy=False)
+        self.assertTrue(math.isnan(field.deserialize([1, float("nan")])[1]))
+
+    def test_float_overflow(self):
+        field = marshmallow.NumericArray("f", allow_nan=True, use_numpy=False)
+        self.assertEqual(array.array("f", [1.5, math.inf]), field.deserialize([1.5, math.inf]))
+        with self.assertRaises(marshmallow.ValidationError):
+            field.deserialize([1.5, 1e300])
+
+    def test_range_validator(self):
+        field = marshmallow.NumericArray(
+            "d", validate=validate.Range(min=0, max=10, max_inclusive=False), use_numpy=False
+        )
+        self.assertEqual(array.array("d", [0, 9.5]), field.deserialize([0, 9.5]))
+        for values in ([-1, 1], [1, 10]):
+            with self.assertRaises(marshmallow.ValidationError):
+                field.deserialize(values)
+
+    def test_typecode(self):
+        with self.assertRaises(ValueError):
+            marshmallow.NumericArray("x")
+
+    def test_copy(self):
+        obj = Series(values=[1, 2])
+        clone = obj.__clone__()
+        clone.values[0] = 5
+        self.assertEqual(1, obj.values[0])
+        self.assertEqual(obj, copy.deepcopy(obj))
+
+    def test_frozen_hash(self):
+        self.assertEqual(hash(FrozenSeries(values=[1, 2])), hash(FrozenSeries(values=[1, 2])))
+
+
+class DefaultSeries(marshmallow.Model):
+    values = marshmallow.NumericArray("d", min=0)
+    counts = marshmallow.NumericArray("i")
+
+
+class FrozenDefaultSeries(marshmallow.Model):
+    values = marshmallow.NumericArray("d")
+
+    class Meta:
+        frozen = True
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestNumericArrayNumpy(unittest.TestCase):
+    def test_load_dump(self):
+        obj = DefaultSeries(values=[1, 2.5], counts=array.array("i", [3]))
+        self.assertIsInstance(obj.values, numpy.ndarray)
+        self.assertEqual(numpy.float64, obj.values.dtype)
+        self.assertEqual(numpy.intc, obj.counts.dtype.type)
+        self.assertEqual({"values": [1.0, 2.5], "counts": [3]}, json.loads(obj.dump_json()))
+
+    def test_validation(self):
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            DefaultSeries(values=[1, -1])
+        self.assertEqual({"values": ["Must be greater than or equal to 0."]}, exc.exception.messages)
+        for data in (
+            {"values": [[1, 2]]},
+            {"values": ["1", "2"]},
+            {"values": [1, None]},
+            {"values": [[1], [2, 3]]},
+            {"counts": [1.5]},
+            {"counts": [1.0]},
+            {"counts": [2 ** 40]},
+            {"counts": [2 ** 70]},
+        ):
+            with self.assertRaises(marshmallow.ValidationError, msg=data):
+                DefaultSeries(**data)
+
+    def test_special(self):
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            DefaultSeries(values=[1, float("nan")])
+        self.assertEqual(
+            {"values": ["Special numeric values (nan or infinity) are not permitted."]}, exc.exception.messages
+        )
+        field = marshmallow.NumericArray("d", allow_nan=True)
+        self.assertTrue(numpy.isnan(field.deserialize([1, float("nan")])[1]))
+
+    def test_float_overflow(self):
+        field = marshmallow.NumericArray("f", allow_nan=True)
+        self.assertEqual([1.5, math.inf], field.deserialize([1.5, math.inf]).tolist())
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with self.assertRaises(marshmallow.ValidationError):
+                field.deserialize([1.5, 1e300])
+
+    def test_range_validator(self):
+        field = marshmallow.NumericArray("d", validate=validate.Range(min=0, max=10, max_inclusive=False))
+        self.assertEqual([0.0, 9.5], field.deserialize([0, 9.5]).tolist())
+        for values in ([-1, 1], [1, 10]):
+            with self.assertRaises(marshmallow.ValidationError):
+                field.deserialize(values)
+        field = marshmallow.NumericArray("d", validate=[validate.Range(min=0), lambda value: len(value) > 1])
+        with self.assertRaises(marshmallow.ValidationError):
+            field.deserialize([1])
+
+    def test_eq(self):
+        self.assertEqual(DefaultSeries(values=[1, 2]), DefaultSeries(values=[1, 2]))
+        self.assertNotEqual(DefaultSeries(values=[1, 2]), DefaultSeries(values=[1, 3]))
+        self.assertNotEqual(DefaultSeries(values=[1, 2]), DefaultSeries(values=[1, 2, 3]))
+
+    def test_frozen_hash(self):
+        self.assertEqual(hash(FrozenDefaultSeries(values=[1, 2])), hash(FrozenDefaultSeries(values=[1, 2])))
+        with self.assertRaises(ValueError):
+            FrozenDefaultSeries(values=[1, 2]).values[0] = 5
+
+    def test_copies(self):
+        obj = DefaultSeries(values=[1, 2])
+        clone = obj.__clone__()
+        clone.values[0] = 5
+        self.assertEqual(1, obj.values[0])
+        cache = marshmallow.PayloadCache()
+        obj1 = DefaultSeries.load_json('{"values": [1, 2]}', cache=cache)
+        obj1.values[0] = 5
+        obj2 = DefaultSeries.load_json('{"values": [1, 2]}', cache=cache)
+        self.assertEqual([1.0, 2.0], obj2.values.tolist())
@@ -0,0 +1,180 @@
+import json
+import threading
+import unittest
+
+import marshmallow_objects as marshmallow
+
+
+class Flag(marshmallow.Model):
+    name = marshmallow.fields.Str(required=True)
+    enabled = marshmallow.fields.Bool()
+    rules = marshmallow.fields.List(marshmallow.fields.Dict())
+    label = marshmallow.fields.Function(
+        serialize=lambda obj, context: "%s%s" % (context.get("prefix", ""), obj.name), dump_only=True,
+    )
+
+
+class Tenant(marshmallow.Model):
+    name = marshmallow.fields.Str()
+    flags = marshmallow.NestedModel(Flag, many=True)
+
+
+class FrozenFlag(marshmallow.Model):
+    name = marshmallow.fields.Str(required=True)
+    enabled = marshmallow.fields.Bool()
+
+    class Meta:
+        frozen = True
+
+
+class TestPayloadCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = marshmallow.PayloadCache()
+        self.data = json.dumps({"name": "acme", "flags": [{"name": "beta", "enabled": True, "rules": [{"a": 1}]}]})
+
+    def test_hit(self):
+        obj1 = Tenant.load_json(self.data, cache=self.cache)
+        obj2 = Tenant.load_json(self.data, cache=self.cache)
+        self.assertEqual(obj1, obj2)
+        self.assertEqual((1, 1, 0, 1, len(self.data)), self.cache.cache_info()[:5])
+
+    def test_copies(self):
+        obj1 = Tenant.load_json(self.data, cache=self.cache)
+        obj1.flags[0].enabled = False
+        obj1.flags[0].rules[0]["a"] = 2
+        obj2 = Tenant.load_json(self.data, cache=self.cache)
+        self.assertIsNot(obj1, obj2)
+        self.assertIsNot(obj1.flags[0], obj2.flags[0])
+        self.assertTrue(obj2.flags[0].enabled)
+        self.assertEqual([{"a": 1}], obj2.flags[0].rules)
+
+    def test_missing_fields(self):
+        data = json.dumps({"flags": [{"name": "beta"}]})
+        Tenant.load_json(data, cache=self.cache)
+        obj = Tenant.load_json(data, cache=self.cache)
+        self.assertEqual({"flags": [{"name": "beta", "label": "beta"}]}, obj.dump())
+        self.assertEqual({"name"}, obj.__missing_fields__)
+
+    def test_frozen(self):
+        data = json.dumps([{"name": "beta"}, {"name": "gamma", "enabled": False}])
+        objs1 = FrozenFlag.load_json(data, many=True, cache=self.cache)
+        objs2 = FrozenFlag.load_json(data, many=True, cache=self.cache)
+        objs3 = FrozenFlag.load_json(data, many=True, cache=self.cache)
+        self.assertEqual(objs1, objs2)
+        self.assertIsNot(objs2, objs3)
+        self.assertIs(objs2[0], objs3[0])
+        self.assertIs(objs2[1], objs3[1])
+
+    def test_context(self):
+        context = {"prefix": "a"}
+        obj1 = Tenant.load_json(self.data, cache=self.cache, context=context)
+        obj2 = Tenant.load_json(self.data, cache=self.cache, context=context)
+        obj2.context = {"prefix": "b"}
+        obj3 = Tenant.load_json(self.data, cache=self.cache, context=context)
+        obj3.context["prefix"] = "c"
+        self.assertEqual({"prefix": "b"}, obj2.flags[0].context)
+        self.assertEqual("bbeta", obj2.dump()["flags"][0]["label"])
+        self.assertEqual({"prefix": "c"}, obj3.flags[0].context)
+        self.assertEqual({"prefix": "a"}, obj1.context)
+        obj4 = Tenant.load_json(self.data, cache=self.cache, context=context)
+        self.assertEqual({"prefix": "a"}, obj4.flags[0].context)
+        self.assertEqual("abeta", obj4.dump()["flags"][0]["label"])
+        frozen1 = FrozenFlag.load_json('{"name": "beta"}', cache=self.cache)
+        frozen2 = FrozenFlag.load_json('{"name": "beta"}', cache=self.cache)
+        frozen1.context["user"] = "admin"
+        self.assertEqual({}, frozen2.context)
+
+    def test_caller_context_changed(self):
+        context = {"prefix": "a"}
+        Flag.load_json('{"name": "x"}', cache=self.cache, context=context)
+        context["prefix"] = "z"
+        obj = Flag.load_json('{"name": "x"}', cache=self.cache, context={"prefix": "a"})
+        self.assertEqual(1, self.cache.cache_info().hits)
+        self.assertEqual({"prefix": "a"}, obj.context)
+        self.assertEqual("ax", obj.dump()["label"])
+
+    def test_options(self):
+        Flag.load_json('{"name": "beta"}', cache=self.cache)
+        Flag.load_json('{"name": "beta"}', cache=self.cache, partial=True)
+        Flag.load_json('{"name": "beta"}', cache=self.cache, context={"prefix": "a"})
+        Flag.load_json('{"name": "beta"}', cache=self.cache, context={"prefix": "b"})
+        Flag.load_json('{"name": "beta"}', cache=self.cache, unknown=marshmallow.EXCLUDE)
+        Flag.load_json('[{"name": "beta"}]', cache=self.cache, many=True)
+        FrozenFlag.load_json('{"name": "beta"}', cache=self.cache)
+        self.assertEqual(0, self.cache.cache_info().hits)
+        obj = Flag.load_json('{"name": "beta"}', cache=self.cache, context={"prefix": "b"})
+        self.assertEqual(1, self.cache.cache_info().hits)
+        self.assertEqual("bbeta", obj.dump()["label"])
+
+    def test_formats(self):
+        data = marshmallow.get_format("binary").dumps({"name": "beta"})
+        Flag.load_format("binary", data, cache=self.cache)
+        obj = Flag.load_format("binary", data, cache=self.cache)
+        self.assertEqual("beta", obj.name)
+        self.assertEqual(1, self.cache.cache_info().hits)
+
+    def test_yaml(self):
+        Flag.load_yaml("name: beta", cache=self.cache)
+        self.assertEqual("beta", Flag.load_yaml("name: beta", cache=self.cache).name)
+        self.assertEqual(1, self.cache.cache_info().hits)
+
+    def test_unhashable_context(self):
+        class Unhashable(object):
+            __hash__ = None
+
+        for _ in range(2):
+            obj = Flag.load_json('{"name": "beta"}', cache=self.cache, context={"value": Unhashable()})
+        self.assertEqual("beta", obj.name)
+        self.assertEqual((0, 2, 0, 0), self.cache.cache_info()[:4])
+        Flag.load_json('{"name": "beta"}', cache=self.cache, context={"value": {1, 2}})
+        self.assertEqual(1, self.cache.cache_info().entries)
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(marshmallow.ValidationError):
+                Flag.load_json("{}", cache=self.cache)
+        self.assertEqual((0, 2, 0, 0), self.cache.cache_info()[:4])
+
+    def test_eviction(self):
+        cache = marshmallow.PayloadCache(max_bytes=40)
+        payloads = ['{"name": "flag%d"}' % index for index in range(3)]
+        for data in payloads:
+            Flag.load_json(data, cache=cache)
+        self.assertEqual((0, 3, 1, 2, 34, 40), cache.cache_info())
+        Flag.load_json(payloads[1], cache=cache)
+        Flag.load_json(payloads[0], cache=cache)
+        self.assertEqual((1, 4, 2, 2, 34, 40), cache.cache_info())
+        Flag.load_json(payloads[1], cache=cache)
+        self.assertEqual(2, cache.cache_info().hits)
+
+    def test_size_in_bytes(self):
+        data = '{"name": "\u00e9t\u00e9"}'
+        Flag.load_json(data, cache=self.cache)
+        self.assertEqual(len(data.encode("utf-8")), self.cache.cache_info().size)
+
+    def test_too_big(self):
+        cache = marshmallow.PayloadCache(max_bytes=10)
+        Flag.load_json('{"name": "beta"}', cache=cache)
+        self.assertEqual((0, 1, 0, 0, 0, 10), cache.cache_info())
+
+    def test_clear(self):
+        Flag.load_json('{"name": "beta"}', cache=self.cache)
+        self.cache.clear()
+        self.assertEqual((0, 1, 0, 0, 0), self.cache.cache_info()[:5])
+
+    def test_threads(self):
+        results = []
+
+        def load():
+            for _ in range(50):
+                results.append(Tenant.load_json(self.data, cache=self.cache).flags[0].name)
+
+        threads = [threading.Thread(target=load) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(["beta"] * 200, results)
+        info = self.cache.cache_info()
+        self.assertEqual(200, info.hits + info.misses)
+        self.assertEqual(1, info.entries)
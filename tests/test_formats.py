@@ -0,0 +1,295 @@
+import io
+import json
+import unittest
+
+try:
+    import msgpack  # noqa
+
+    skip_msgpack = False
+except ImportError:
+    skip_msgpack = True
+
+try:
+    import yaml  # noqa
+
+    skip_yaml = False
+except ImportError:
+    skip_yaml = True
+
+import marshmallow_objects as marshmallow
+
+
+class Person(marshmallow.Model):
+    name = marshmallow.fields.Str(required=True)
+    age = marshmallow.fields.Int()
+    greeting = marshmallow.fields.Function(
+        serialize=lambda obj, context: "%s %s" % (context.get("greeting", "Hi"), obj.name), dump_only=True,
+    )
+
+
+class Company(marshmallow.Model):
+    name = marshmallow.fields.Str()
+    owner = marshmallow.NestedModel(Person)
+    workers = marshmallow.NestedModel(Person, many=True)
+
+
+class UpperFormat(marshmallow.Format):
+    name = "upper"
+
+    def loads(self, data):
+        return {"name": data.lower()}
+
+    def dumps(self, data):
+        return data["name"].upper()
+
+
+class TestRegistry(unittest.TestCase):
+    def test_registered(self):
+        formats = marshmallow.registered_formats()
+        for name in ("json", "yaml", "ini", "binary"):
+            self.assertIn(name, formats)
+
+    @unittest.skipIf(skip_msgpack, "msgpack is not installed")
+    def test_registered_msgpack(self):
+        self.assertIn("msgpack", marshmallow.registered_formats())
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            marshmallow.get_format("unknown")
+        with self.assertRaises(ValueError):
+            Person.load_format("unknown", "")
+
+    def test_custom(self):
+        marshmallow.register_format(UpperFormat())
+        obj = Person.load_format("upper", "JOHN")
+        self.assertEqual("john", obj.name)
+        self.assertEqual("JOHN", obj.dump_format("upper"))
+
+    def test_no_streaming(self):
+        with self.assertRaises(NotImplementedError):
+            list(Person.load_stream("ini", io.StringIO("")))
+
+
+class FormatTestMixin(object):
+    format = None
+    stream_class = io.StringIO
+
+    def setUp(self):
+        self.data = {
+            "name": "ACME",
+            "owner": {"name": "John Doe", "age": 42},
+            "workers": [{"name": "Bob", "age": -1}, {"name": "Alice"}],
+        }
+
+    def expected(self, greeting="Hi"):
+        ret = {
+            "name": "ACME",
+            "owner": {"name": "John Doe", "age": 42},
+            "workers": [{"name": "Bob", "age": -1}, {"name": "Alice"}],
+        }
+        for person in [ret["owner"]] + ret["workers"]:
+            person["greeting"] = "%s %s" % (greeting, person["name"])
+        return ret
+
+    def dumps(self, data):
+        return marshmallow.get_format(self.format).dumps(data)
+
+    def test_load_dump(self):
+        obj = Company.load_format(self.format, self.dumps(self.data))
+        self.assertEqual("Bob", obj.workers[0].name)
+        self.assertIsNone(obj.workers[1].age)
+        loaded = Company.load_format(self.format, obj.dump_format(self.format), unknown=marshmallow.EXCLUDE)
+        self.assertEqual(obj, loaded)
+        self.assertEqual(self.expected(), loaded.dump())
+
+    def test_many(self):
+        objs = Company.load_format(self.format, self.dumps([self.data, self.data]), many=True)
+        self.assertEqual(2, len(objs))
+        ddata = marshmallow.get_format(self.format).loads(marshmallow.dump_many_format(self.format, objs))
+        self.assertEqual([self.expected(), self.expected()], ddata)
+
+    def test_options(self):
+        with self.assertRaises(marshmallow.ValidationError):
+            Company.load_format(self.format, self.dumps({"owner": {"age": 1}}))
+        obj = Company.load_format(self.format, self.dumps({"owner": {"age": 1}}), partial=True)
+        self.assertEqual(1, obj.owner.age)
+
+        data = {"owner": {"name": "John Doe", "unknown": 1}}
+        with self.assertRaises(marshmallow.ValidationError):
+            Company.load_format(self.format, self.dumps(data))
+        obj = Company.load_format(self.format, self.dumps(data), unknown=marshmallow.EXCLUDE)
+        self.assertEqual("John Doe", obj.owner.name)
+
+        obj = Company.load_format(self.format, self.dumps(self.data), context={"greeting": "Hello"})
+        self.assertEqual(self.expected("Hello"), obj.dump())
+
+    def test_stream(self):
+        objs = Company.load([self.data, self.data, {"name": "Empty"}], many=True)
+        fp = self.stream_class()
+        marshmallow.dump_stream(self.format, objs, fp)
+        fp.seek(0)
+        loaded = Company.load_stream(self.format, fp, context={"greeting": "Hello"}, unknown=marshmallow.EXCLUDE)
+        self.assertNotIsInstance(loaded, list)
+        loaded = list(loaded)
+        self.assertEqual(objs, loaded)
+        self.assertEqual(self.expected("Hello"), loaded[0].dump())
+
+    def test_stream_many(self):
+        fp = self.stream_class()
+        marshmallow.get_format(self.format).dump_stream([[self.data], [self.data, self.data]], fp)
+        fp.seek(0)
+        loaded = list(Company.load_stream(self.format, fp, many=True))
+        self.assertEqual([1, 2], [len(objs) for objs in loaded])
+
+
+class TestJson(FormatTestMixin, unittest.TestCase):
+    format = "json"
+
+
+@unittest.skipIf(skip_yaml, "PyYaml is not installed")
+class TestYaml(FormatTestMixin, unittest.TestCase):
+    format = "yaml"
+
+
+@unittest.skipIf(skip_msgpack, "msgpack is not installed")
+class TestMsgPack(FormatTestMixin, unittest.TestCase):
+    format = "msgpack"
+    stream_class = io.BytesIO
+
+
+class TestBinary(FormatTestMixin, unittest.TestCase):
+    format = "binary"
+    stream_class = io.BytesIO
+
+    def test_values(self):
+        fmt = marshmallow.get_format("binary")
+        values = [
+            None,
+            True,
+            False,
+            0,
+            1,
+            -1,
+            63,
+            -64,
+            2 ** 70,
+            -(2 ** 70),
+            1.5,
+            float("inf"),
+            "",
+            "unicode ☺",
+            b"\x00\xff",
+            [],
+            [1, [2, [3]]],
+            {},
+            {"a": {"b": None}, 1: [True]},
+        ]
+        for value in values:
+            self.assertEqual(value, fmt.loads(fmt.dumps(value)))
+        self.assertEqual([1, 2], fmt.loads(fmt.dumps((1, 2))))
+
+    def test_compact(self):
+        fmt = marshmallow.get_format("binary")
+        self.assertEqual(b"\x03\x02", fmt.dumps(1))
+        self.assertEqual(b"\x05\x01a", fmt.dumps("a"))
+        self.assertLess(len(fmt.dumps(self.data)), len(marshmallow.get_format("json").dumps(self.data)))
+
+    def test_errors(self):
+        fmt = marshmallow.get_format("binary")
+        with self.assertRaises(TypeError):
+            fmt.dumps(object())
+        with self.assertRaises(ValueError):
+            fmt.loads(b"")
+        with self.assertRaises(ValueError):
+            fmt.loads(b"\x05\x05abc")
+        with self.assertRaises(ValueError):
+            fmt.loads(b"\x00\x00")
+        with self.assertRaises(ValueError):
+            fmt.loads(b"\xff")
+
+
+class CountingStringIO(io.StringIO):
+    def __init__(self, *args, **kwargs):
+        super(CountingStringIO, self).__init__(*args, **kwargs)
+        self.read_size = 0
+
+    def read(self, size=-1):
+        data = super(CountingStringIO, self).read(size)
+        self.read_size += len(data)
+        return data
+
+
+class TestJsonArray(unittest.TestCase):
+    def setUp(self):
+        self.values = [1, -2.5, 3e-10, 12345678901234567890, "a,]b ☺", None, True, [], {}, {"a": [1, {"b": "]"}]}]
+        self.data = [{"name": "John Doe", "age": 42}, {"name": "Bob"}, {"name": "Alice", "age": 7}]
+
+    def test_values(self):
+        fmt = marshmallow.get_format("json")
+        text = " \n" + json.dumps(self.values) + " \n"
+        for chunk_size in (1, 2, 3, 7, 65536):
+            self.assertEqual(self.values, list(fmt.load_array(io.StringIO(text), chunk_size)))
+            self.assertEqual(self.values, list(fmt.load_array(io.BytesIO(text.encode("utf-8")), chunk_size)))
+        self.assertEqual([], list(fmt.load_array(io.StringIO("[ ]"))))
+
+    def test_syntax_errors(self):
+        fmt = marshmallow.get_format("json")
+        errors = {
+            "": "Unexpected end",
+            "{}": "Expecting '['",
+            "[1,]": "Element 1: Expecting value",
+            "[1 2]": "Element 0: Expecting ','",
+            "[1, 2": "Element 1: Unexpected end",
+            "[1] 2": "Extra data",
+        }
+        for text, error in errors.items():
+            with self.assertRaises(json.JSONDecodeError) as exc:
+                list(fmt.load_array(io.StringIO(text), 2))
+            self.assertIn(error, str(exc.exception))
+
+    def test_malformed_element(self):
+        fmt = marshmallow.get_format("json")
+        valid = json.dumps(self.data * 1000)[1:]
+        for text in ('[{"name": Bob}, ' + valid, "[1x, " + valid):
+            fp = CountingStringIO(text)
+            with self.assertRaises(json.JSONDecodeError):
+                list(fmt.load_array(fp, 64))
+            self.assertLess(fp.read_size, 200)
+
+    def test_error_position(self):
+        fmt = marshmallow.get_format("json")
+        text = "[\n" + ",\n".join(["1234567890"] * 10) + ",\n  x]"
+        with self.assertRaises(json.JSONDecodeError) as exc:
+            list(fmt.load_array(io.StringIO(text), 4))
+        self.assertEqual(text.index("x"), exc.exception.pos)
+        self.assertEqual(12, exc.exception.lineno)
+        self.assertEqual(3, exc.exception.colno)
+        self.assertIn("line 12 column 3 (char %d)" % text.index("x"), str(exc.exception))
+
+    def test_load(self):
+        objs = Person.load_json_iter(io.StringIO(json.dumps(self.data)), context={"greeting": "Hello"})
+        self.assertNotIsInstance(objs, list)
+        objs = list(objs)
+        self.assertEqual(Person.load(self.data, many=True), objs)
+        self.assertEqual("Hello Bob", objs[1].dump()["greeting"])
+
+    def test_incremental(self):
+        fp = CountingStringIO(json.dumps(self.data * 1000))
+        objs = Person.load_json_iter(fp, chunk_size=16)
+        self.assertEqual("John Doe", next(objs).name)
+        self.assertLess(fp.read_size, 100)
+        self.assertEqual(2999, len(list(objs)))
+
+    def test_options(self):
+        data = [{"age": 1}, {"name": "Bob", "unknown": 1}]
+        objs = list(Person.load_json_iter(io.StringIO(json.dumps(data)), partial=True, unknown=marshmallow.EXCLUDE))
+        self.assertEqual(1, objs[0].age)
+        self.assertEqual("Bob", objs[1].name)
+
+    def test_validation_error(self):
+        data = [{"name": "John Doe"}, {"name": "Bob", "age": "old"}, {"name": "Alice"}]
+        objs = Person.load_json_iter(io.StringIO(json.dumps(data)))
+        self.assertEqual("John Doe", next(objs).name)
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            next(objs)
+        self.assertEqual({1: {"age": ["Not a valid integer."]}}, exc.exception.messages)
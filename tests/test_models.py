@@ -1,7 +1,11 @@
 import collections
 import copy
+import decimal
+import gc
 import json
+import threading
 import unittest
+import weakref
 
 try:
     import yaml
@@ -10,6 +14,8 @@ try:
 except ImportError:
     skip_yaml = True
 
+from marshmallow import Schema
+
 import marshmallow_objects as marshmallow
 
 
@@ -84,6 +90,11 @@ class BContext(marshmallow.Model):
     a = marshmallow.NestedModel(AContext)
 
 
+class CContext(marshmallow.Model):
+    bb = marshmallow.NestedModel(BContext, many=True)
+    aa = marshmallow.fields.List(marshmallow.NestedModel(AContext))
+
+
 class TestModelMeta(unittest.TestCase):
     def test_schema_name(self):
         self.assertEqual("ASchema", A.__schema_class__.__name__)
@@ -125,6 +136,38 @@ class TestModelMeta(unittest.TestCase):
     def test_schema_class_override(self):
         self.assertTrue(issubclass(D.__schema_class__, CustomSchema), D.__schema_class__.__bases__)
 
+    def test_lazy_schema_class(self):
+        class Lazy(marshmallow.Model):
+            name = marshmallow.fields.Str()
+
+        class LazyChild(Lazy):
+            nested = marshmallow.NestedModel(Lazy)
+
+        self.assertIsInstance(LazyChild.__dict__["__schema_class__"], marshmallow.models._LazySchemaClass)
+        self.assertIsInstance(Lazy.__dict__["__schema_class__"], marshmallow.models._LazySchemaClass)
+        self.assertTrue(issubclass(LazyChild.__schema_class__, Lazy.__schema_class__))
+        self.assertIs(LazyChild.__dict__["__schema_class__"], LazyChild.__schema_class__)
+        self.assertIs(Lazy.__dict__["__schema_class__"], Lazy.__schema_class__)
+
+    def test_warm_up(self):
+        class WarmUpNested(marshmallow.Model):
+            name = marshmallow.fields.Str()
+
+        class WarmUp(marshmallow.Model):
+            nested = marshmallow.NestedModel(WarmUpNested)
+            nested_list = marshmallow.fields.List(marshmallow.NestedModel("SelfNested"))
+
+        self.assertIs(WarmUp, WarmUp.warm_up())
+        self.assertNotIsInstance(WarmUp.__dict__["__schema_class__"], marshmallow.models._LazySchemaClass)
+        self.assertNotIsInstance(WarmUpNested.__dict__["__schema_class__"], marshmallow.models._LazySchemaClass)
+
+    def test_compile_all(self):
+        class Compiled(marshmallow.Model):
+            name = marshmallow.fields.Str()
+
+        marshmallow.compile_all()
+        self.assertNotIsInstance(Compiled.__dict__["__schema_class__"], marshmallow.models._LazySchemaClass)
+
 
 class TestModel(unittest.TestCase):
     def test_tag_field(self):
@@ -229,15 +272,23 @@ class TestModel(unittest.TestCase):
         a = AMethod(yes_no="NOOOO")
         self.assertFalse(a.yes_no)
 
-    def test_dump_mode_on(self):
-        a = A()
-        self.assertFalse(a.__dump_mode__)
-        with a.__dump_mode_on__():
-            self.assertTrue(a.__dump_mode__)
-            with a.__dump_mode_on__():
-                self.assertTrue(a.__dump_mode__)
-            self.assertTrue(a.__dump_mode__)
-        self.assertFalse(a.__dump_mode__)
+    def test_concurrent_dump(self):
+        obj = MissingCompany(owner={"name": "John Doe"}, workers=[{"name": "Bob"}])
+        expected = obj.dump()
+        results = []
+
+        def dump():
+            for _ in range(100):
+                results.append(obj.dump() == expected)
+
+        threads = [threading.Thread(target=dump) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(400, len(results))
+        self.assertTrue(all(results))
+        self.assertIsNone(obj.hr)
 
 
 class TestModelLoadDump(unittest.TestCase):
@@ -268,6 +319,26 @@ class TestModelLoadDump(unittest.TestCase):
         a = A.load_json(jdata)
         self.assertEqual("foo", a.test_field)
 
+    def test_load_json_render_module(self):
+        class DecimalJson(object):
+            @staticmethod
+            def loads(data, *args, **kwargs):
+                return json.loads(data, *args, parse_float=decimal.Decimal, **kwargs)
+
+            dumps = staticmethod(json.dumps)
+
+        class Price(marshmallow.Model):
+            amount = marshmallow.fields.Raw()
+
+            class Meta:
+                render_module = DecimalJson
+
+        self.assertEqual(decimal.Decimal("1.10"), Price.load_json('{"amount": 1.10}').amount)
+        cache = marshmallow.PayloadCache()
+        for _ in range(2):
+            self.assertEqual(decimal.Decimal("1.10"), Price.load_json('{"amount": 1.10}', cache=cache).amount)
+        self.assertEqual(1.1, Price.load_json('{"amount": 1.10}', render_module=json).amount)
+
     def test_load_json_partial(self):
         self.assertRaises(marshmallow.ValidationError, B)
         b = B.load_json("{}", partial=True)
@@ -351,6 +422,67 @@ class TestContext(unittest.TestCase):
         ddata = b.dump()
         self.assertFalse(ddata["a"]["test_context_field"])
 
+    def test_override_context_lists(self):
+        c = CContext(context=self.context, bb=[self.nested_data], aa=[self.data, self.data])
+        context = {"value": "bar"}
+        c.context = context
+        self.assertIs(context, c.bb[0].context)
+        self.assertIs(context, c.bb[0].a.context)
+        self.assertIs(context, c.aa[1].context)
+        ddata = c.dump()
+        self.assertFalse(ddata["bb"][0]["a"]["test_context_field"])
+        self.assertFalse(ddata["aa"][0]["test_context_field"])
+
+    def test_passed_nested_context(self):
+        b = BContext(context=self.context, a=AContext(**self.data))
+        self.assertIs(self.context, b.a.context)
+        c = CContext(context=self.context, bb=[b], aa=[AContext(**self.data)])
+        context = {"value": "bar"}
+        c.context = context
+        self.assertIs(context, c.bb[0].a.context)
+        self.assertIs(context, c.aa[0].context)
+
+    def test_assigned_nested_context(self):
+        b = BContext(context=self.context, **self.nested_data)
+        b.a = AContext.load(self.data, context={"value": "bar"})
+        self.assertIs(self.context, b.a.context)
+        context = {"value": "bar"}
+        b.context = context
+        self.assertIs(context, b.a.context)
+        c = CContext(context=self.context)
+        c.aa = [AContext(**self.data)]
+        self.assertIs(self.context, c.aa[0].context)
+
+    def test_updated_nested_context(self):
+        c = CContext(context=self.context)
+        c.update({"bb": [self.nested_data], "aa": [self.data]})
+        context = {"value": "bar"}
+        c.context = context
+        self.assertIs(context, c.bb[0].context)
+        self.assertIs(context, c.bb[0].a.context)
+        self.assertIs(context, c.aa[0].context)
+
+    def test_nested_own_context(self):
+        c = CContext(context=self.context, bb=[self.nested_data, self.nested_data])
+        context = {"value": "bar"}
+        c.bb[0].context = context
+        self.assertIs(self.context, c.context)
+        self.assertIs(self.context, c.bb[1].a.context)
+        self.assertIs(context, c.bb[0].context)
+        self.assertIs(context, c.bb[0].a.context)
+        self.assertFalse(c.bb[0].dump()["a"]["test_context_field"])
+        c.bb[0].context = self.context
+        self.assertIs(self.context, c.bb[0].a.context)
+
+    def test_deepcopy_context(self):
+        b = BContext(context=self.context, **self.nested_data)
+        b_copy = copy.deepcopy(b)
+        self.assertEqual(self.context, b_copy.a.context)
+        b_copy.context["value"] = "bar"
+        self.assertEqual({"value": "foo"}, b.context)
+        self.assertEqual({"value": "bar"}, b_copy.a.context)
+        self.assertTrue(b.dump()["a"]["test_context_field"])
+
     def test_validate_partial(self):
         class APartial(marshmallow.Model):
             test_field = marshmallow.fields.Str(required=True)
@@ -519,6 +651,10 @@ class TestOptionalModel(unittest.TestCase):
         ddata = obj.dump()
         self.assertEqual({"int_field": 1}, ddata)
 
+    def test_dump_many_missing_fields(self):
+        ddata = marshmallow.dump_many([OptionalModel(partial=True)])
+        self.assertEqual([{"int_field": -1}], ddata)
+
 
 class TestValidatePartial(unittest.TestCase):
     def setUp(self):
@@ -578,6 +714,470 @@ class TestMissingFields(unittest.TestCase):
         self.assertEqual({"owner": {"name": "John Doe"}, "assets": [{"name": "MissingAsset"}]}, obj.dump())
 
 
+class CompactPerson(marshmallow.Model):
+    name = marshmallow.fields.String()
+    age = marshmallow.fields.Integer()
+
+    class Meta:
+        compact = True
+
+
+class CompactEmployee(CompactPerson):
+    title = marshmallow.fields.String(missing="engineer")
+
+
+class CompactCompany(marshmallow.Model):
+    owner = marshmallow.NestedModel(CompactPerson)
+    workers = marshmallow.NestedModel(CompactEmployee, many=True)
+
+    class Meta:
+        compact = True
+
+
+class TestCompact(unittest.TestCase):
+    def test_no_dict(self):
+        self.assertFalse(hasattr(CompactPerson(name="John Doe"), "__dict__"))
+        self.assertFalse(hasattr(CompactEmployee(name="John Doe"), "__dict__"))
+
+    def test_values(self):
+        obj = CompactEmployee(name="John Doe")
+        self.assertEqual("John Doe", obj.name)
+        self.assertIsNone(obj.age)
+        self.assertEqual("engineer", obj.title)
+
+    def test_missing_fields(self):
+        obj = CompactEmployee(name="John Doe")
+        self.assertEqual({"age"}, obj.__missing_fields__)
+        self.assertEqual({"name": "John Doe", "title": "engineer"}, obj.dump())
+        obj.age = 42
+        self.assertEqual(set(), obj.__missing_fields__)
+        self.assertEqual({"name": "John Doe", "age": 42, "title": "engineer"}, obj.dump())
+
+    def test_nested(self):
+        data = {"owner": {"name": "John Doe"}, "workers": [{"name": "Bob", "age": 42}]}
+        obj = CompactCompany.load(data)
+        self.assertEqual("Bob", obj.workers[0].name)
+        data["workers"][0]["title"] = "engineer"
+        self.assertEqual(data, obj.dump())
+
+    def test_unknown_attribute(self):
+        obj = CompactPerson(name="John Doe")
+        with self.assertRaises(AttributeError):
+            obj.unknown = "foo"
+
+    def test_eq_copy(self):
+        obj = CompactCompany(owner={"name": "John Doe"})
+        self.assertEqual(obj, copy.copy(obj))
+        self.assertEqual(obj, copy.deepcopy(obj))
+
+    def test_shared_lock(self):
+        self.assertIs(CompactPerson(name="John Doe").__missing_lock__, CompactEmployee(name="Bob").__missing_lock__)
+
+
+class FrozenPerson(marshmallow.Model):
+    name = marshmallow.fields.String()
+    age = marshmallow.fields.Integer()
+    tags = marshmallow.fields.List(marshmallow.fields.String())
+
+    class Meta:
+        frozen = True
+
+
+class FrozenCompany(marshmallow.Model):
+    name = marshmallow.fields.String()
+    owner = marshmallow.NestedModel(FrozenPerson)
+
+    class Meta:
+        frozen = True
+        compact = True
+
+
+class TestFrozen(unittest.TestCase):
+    def test_setattr(self):
+        obj = FrozenPerson(name="John Doe")
+        with self.assertRaises(AttributeError):
+            obj.name = "Jane Doe"
+        with self.assertRaises(AttributeError):
+            del obj.name
+        self.assertEqual("John Doe", obj.name)
+
+    def test_hash(self):
+        obj1 = FrozenPerson(name="John Doe", tags=["a", "b"])
+        obj2 = FrozenPerson(name="John Doe", tags=["a", "b"])
+        obj3 = FrozenPerson(name="John Doe", tags=["a"])
+        self.assertEqual(hash(obj1), hash(obj2))
+        self.assertEqual(2, len({obj1, obj2, obj3}))
+        self.assertEqual(hash(obj1), obj1.__hash_value__)
+
+    def test_eq(self):
+        obj1 = FrozenPerson(name="John Doe")
+        obj2 = FrozenPerson(name="John Doe")
+        obj3 = FrozenPerson(name="Jane Doe")
+        self.assertEqual(obj1, obj1)
+        self.assertEqual(obj1, obj2)
+        self.assertNotEqual(obj1, obj3)
+        self.assertNotEqual(hash(obj1), hash(obj3))
+        self.assertNotEqual(obj1, obj3)
+
+    def test_nested(self):
+        obj = FrozenCompany(name="ACME", owner={"name": "John Doe"})
+        self.assertEqual(hash(obj), hash(FrozenCompany(name="ACME", owner={"name": "John Doe"})))
+        self.assertEqual({"name": "ACME", "owner": {"name": "John Doe"}}, obj.dump())
+        with self.assertRaises(AttributeError):
+            obj.owner.name = "Jane Doe"
+
+    def test_copy(self):
+        obj = FrozenPerson(name="John Doe")
+        self.assertIs(obj, copy.copy(obj))
+        self.assertIs(obj, copy.deepcopy(obj))
+
+    def test_not_frozen_unhashable(self):
+        with self.assertRaises(TypeError):
+            hash(MissingPerson(name="John Doe"))
+
+    def test_containers(self):
+        class FrozenConfig(marshmallow.Model):
+            tags = marshmallow.fields.List(marshmallow.fields.String())
+            options = marshmallow.fields.Dict()
+
+            class Meta:
+                frozen = True
+
+        obj = FrozenConfig(tags=["a"], options={"b": [1]})
+        hash_value = hash(obj)
+        with self.assertRaises(AttributeError):
+            obj.tags.append("b")
+        with self.assertRaises(TypeError):
+            obj.options["c"] = 2
+        with self.assertRaises(TypeError):
+            obj.options.update(c=2)
+        with self.assertRaises(AttributeError):
+            obj.options["b"].append(2)
+        self.assertEqual(hash_value, hash(FrozenConfig(tags=["a"], options={"b": [1]})))
+        self.assertEqual({"tags": ["a"], "options": {"b": [1]}}, json.loads(obj.dump_json()))
+        self.assertEqual(obj, obj.__clone__())
+
+    def test_not_frozen_nested(self):
+        class FrozenTeam(marshmallow.Model):
+            members = marshmallow.NestedModel(MissingPerson, many=True)
+
+            class Meta:
+                frozen = True
+
+        class FrozenProject(marshmallow.Model):
+            team = marshmallow.fields.List(marshmallow.NestedModel(FrozenPerson))
+            shapes = marshmallow.PolymorphicNestedModel(Shape)
+
+            class Meta:
+                frozen = True
+
+        class FrozenBoard(marshmallow.Model):
+            members = marshmallow.fields.List(marshmallow.NestedModel(MissingPerson))
+
+            class Meta:
+                frozen = True
+
+        for model in (FrozenTeam, FrozenProject, FrozenBoard):
+            with self.assertRaises(ValueError):
+                model()
+            # the check is not skipped on the next access
+            with self.assertRaises(ValueError):
+                model.__schema_class__
+
+
+class UpdatePerson(marshmallow.Model):
+    name = marshmallow.fields.String(required=True)
+    age = marshmallow.fields.Integer(data_key="Age")
+
+
+class UpdateCompany(marshmallow.Model):
+    name = marshmallow.fields.String()
+    owner = marshmallow.NestedModel(UpdatePerson)
+    workers = marshmallow.NestedModel(UpdatePerson, many=True)
+
+
+class TestUpdate(unittest.TestCase):
+    def setUp(self):
+        self.obj = UpdateCompany(name="ACME", owner={"name": "John Doe", "Age": 42}, workers=[{"name": "Bob"}])
+
+    def test_update(self):
+        self.assertIs(self.obj, self.obj.update({"name": "ACME Inc."}))
+        self.assertEqual("ACME Inc.", self.obj.name)
+        self.assertEqual("John Doe", self.obj.owner.name)
+
+    def test_nested(self):
+        owner = self.obj.owner
+        self.obj.update({"owner": {"Age": 43}})
+        self.assertIs(owner, self.obj.owner)
+        self.assertEqual(43, owner.age)
+        self.assertEqual("John Doe", owner.name)
+
+    def test_nested_many(self):
+        self.obj.update({"workers": [{"name": "Alice"}]})
+        self.assertEqual(["Alice"], [worker.name for worker in self.obj.workers])
+
+    def test_missing_fields(self):
+        obj = UpdateCompany(name="ACME", partial=True)
+        self.assertEqual({"name": "ACME"}, obj.dump())
+        obj.update({"owner": {"name": "John Doe"}})
+        obj.update({"owner": {"Age": 42}})
+        self.assertEqual({"name": "ACME", "owner": {"name": "John Doe", "Age": 42}}, obj.dump())
+        self.assertEqual({"workers"}, obj.__missing_fields__)
+
+    def test_atomic(self):
+        expected = self.obj.dump()
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            self.obj.update({"name": "ACME Inc.", "owner": {"name": "Jane Doe", "Age": "old"}})
+        self.assertEqual({"owner": {"Age": ["Not a valid integer."]}}, exc.exception.messages)
+        self.assertEqual(expected, self.obj.dump())
+
+    def test_partial(self):
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            self.obj.update({"owner": {"Age": 43}}, partial=False)
+        self.assertEqual({"owner": {"name": ["Missing data for required field."]}}, exc.exception.messages)
+        self.obj.update({"owner": {"name": "Jane Doe", "Age": 43}}, partial=False)
+        self.assertEqual("Jane Doe", self.obj.owner.name)
+
+    def test_unknown(self):
+        with self.assertRaises(marshmallow.ValidationError):
+            self.obj.update({"owner": {"unknown": 1}})
+        self.obj.update({"owner": {"Age": 43, "unknown": 1}}, unknown=marshmallow.EXCLUDE)
+        self.assertEqual(43, self.obj.owner.age)
+
+    def test_frozen(self):
+        obj = FrozenPerson(name="John Doe")
+        with self.assertRaises(AttributeError):
+            obj.update({"name": "Jane Doe"})
+
+
+class PooledPerson(marshmallow.Model):
+    name = marshmallow.fields.String()
+    age = marshmallow.fields.Integer()
+
+    class Meta:
+        pool_size = 2
+
+
+class CompactPooledPerson(PooledPerson):
+    class Meta:
+        pool_size = 2
+        compact = True
+
+
+class PooledCompany(marshmallow.Model):
+    name = marshmallow.fields.String()
+    workers = marshmallow.NestedModel(PooledPerson, many=True)
+
+
+class TestLoadInto(unittest.TestCase):
+    def test_load_into(self):
+        for model in (PooledPerson, CompactPooledPerson):
+            obj = model(name="John Doe", context={"a": 1})
+            self.assertIs(obj, obj.load_into({"age": 42}, partial=True))
+            self.assertIsNone(obj.name)
+            self.assertEqual(42, obj.age)
+            self.assertEqual({"name"}, obj.__missing_fields__)
+            self.assertEqual({"a": 1}, obj.context)
+
+    def test_invalid(self):
+        obj = UpdatePerson(name="John Doe")
+        with self.assertRaises(marshmallow.ValidationError):
+            obj.load_into({"name": "Jane Doe", "Age": "old"})
+        self.assertEqual({"name": "John Doe"}, obj.dump())
+
+    def test_frozen(self):
+        obj = FrozenPerson(name="John Doe")
+        with self.assertRaises(AttributeError):
+            obj.load_into({"name": "Jane Doe"})
+        obj.release()
+        self.assertEqual("John Doe", obj.name)
+
+    def test_pool(self):
+        for model in (PooledPerson, CompactPooledPerson):
+            objs = model.load([{"name": "Bob"}, {"name": "Alice"}, {"name": "Eve"}], many=True)
+            for obj in objs:
+                obj.release()
+            self.assertEqual(objs[:2], model.__pool__)
+            self.assertIsNone(objs[0].name)
+            objs[0].release()
+            self.assertEqual(2, len(model.__pool__))
+            reused = model.load([{"age": 1}, {"age": 2}, {"age": 3}], many=True)
+            self.assertEqual([objs[1], objs[0]], reused[:2])
+            self.assertEqual([{"age": 1}, {"age": 2}, {"age": 3}], [obj.dump() for obj in reused])
+            self.assertEqual([], model.__pool__)
+
+    def test_release_nested(self):
+        obj = PooledCompany(name="ACME", workers=[{"name": "Bob"}])
+        worker = obj.workers[0]
+        obj.release()
+        self.assertIs(worker, PooledPerson.__pool__.pop())
+        self.assertIsNone(PooledCompany.__pool__)
+
+    def test_subclass_pool(self):
+        self.assertIsNot(PooledPerson.__pool__, CompactPooledPerson.__pool__)
+
+        class Child(PooledPerson):
+            class Meta:
+                ordered = True
+
+        self.assertIsNone(Child.__pool__)
+        Child(name="Bob").release()
+        obj = PooledPerson(name="Alice")
+        self.assertIs(PooledPerson, obj.__class__)
+
+    def test_frozen_pool(self):
+        with self.assertRaises(ValueError):
+
+            class FrozenPooled(marshmallow.Model):
+                class Meta:
+                    frozen = True
+                    pool_size = 2
+
+
+class Shape(marshmallow.Model):
+    type = marshmallow.fields.String()
+    name = marshmallow.fields.String()
+
+
+class Circle(Shape):
+    type = marshmallow.fields.Constant("circle")
+    radius = marshmallow.fields.Float(required=True)
+
+
+class BigCircle(Circle):
+    pass
+
+
+class Square(Shape):
+    type = marshmallow.fields.Constant("square")
+    side = marshmallow.fields.Integer()
+
+
+class Drawing(marshmallow.Model):
+    main = marshmallow.PolymorphicNestedModel(Shape, allow_none=True)
+    shapes = marshmallow.PolymorphicNestedModel(Shape, discriminator="type", many=True)
+
+
+class TestPolymorphicNested(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "main": {"type": "square", "side": 2},
+            "shapes": [{"type": "circle", "radius": 1.5}, {"type": "square", "side": 3, "name": "box"}],
+        }
+
+    def test_index(self):
+        model_classes = Drawing.__schema_class__._declared_fields["shapes"].model_classes
+        self.assertIs(Circle, model_classes["circle"])
+        self.assertIs(Square, model_classes["square"])
+        self.assertNotIn(None, model_classes)
+
+    def test_load(self):
+        obj = Drawing(**self.data)
+        self.assertIsInstance(obj.main, Square)
+        self.assertEqual([Circle, Square], [shape.__class__ for shape in obj.shapes])
+        self.assertEqual(1.5, obj.shapes[0].radius)
+        self.assertEqual("box", obj.shapes[1].name)
+
+    def test_dump(self):
+        obj = Drawing(**self.data)
+        self.assertEqual(self.data, obj.dump())
+        obj.shapes.append(BigCircle(radius=2))
+        self.assertEqual({"type": "circle", "radius": 2.0}, obj.dump()["shapes"][2])
+
+    def test_errors(self):
+        data = {"shapes": [{"type": "circle"}, {"type": "square", "side": 1}, {"type": "star"}, 1]}
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            Drawing(**data)
+        self.assertEqual(
+            {
+                "shapes": {
+                    0: {"radius": ["Missing data for required field."]},
+                    2: {"type": ["Unknown type 'star'."]},
+                    3: ["Invalid input type."],
+                }
+            },
+            exc.exception.messages,
+        )
+
+    def test_none(self):
+        obj = Drawing(main=None, shapes=[])
+        self.assertEqual({"main": None, "shapes": []}, obj.dump())
+
+    def test_context(self):
+        obj = Drawing(**self.data)
+        context = {"a": 1}
+        obj.context = context
+        self.assertIs(context, obj.main.context)
+        self.assertIs(context, obj.shapes[0].context)
+
+    def test_unknown(self):
+        data = {"shapes": [{"type": "square", "side": 3, "color": "red"}]}
+        with self.assertRaises(marshmallow.ValidationError):
+            Drawing(**data)
+        obj = Drawing.load(data, unknown=marshmallow.EXCLUDE)
+        self.assertEqual(3, obj.shapes[0].side)
+        with self.assertRaises(marshmallow.ValidationError):
+            Drawing(**data)
+
+    def test_new_model(self):
+        class Triangle(Shape):
+            type = marshmallow.fields.Constant("triangle")
+
+        obj = Drawing(shapes=[{"type": "triangle"}])
+        self.assertIsInstance(obj.shapes[0], Triangle)
+
+    def test_ambiguous(self):
+        class Token(marshmallow.Model):
+            type = marshmallow.fields.String()
+
+        class Word(Token):
+            type = marshmallow.fields.Constant("word")
+
+        class Name(Token):
+            type = marshmallow.fields.Constant("word")
+
+        class Sentence(marshmallow.Model):
+            tokens = marshmallow.PolymorphicNestedModel(Token, many=True)
+
+        class Number(Token):
+            type = marshmallow.fields.Constant("number")
+
+        with self.assertRaises(marshmallow.ValidationError) as exc:
+            Sentence(tokens=[{"type": "number"}, {"type": "word"}])
+        self.assertEqual(
+            {"tokens": {1: {"type": ["Ambiguous type 'word', shared by Name, Word."]}}}, exc.exception.messages
+        )
+        self.assertIsInstance(Sentence(tokens=[{"type": "number"}]).tokens[0], Number)
+        self.assertEqual({"number": Number}, Sentence.__schema_class__._declared_fields["tokens"].model_classes)
+
+    def test_models_freed(self):
+        class Token(marshmallow.Model):
+            type = marshmallow.fields.String()
+
+            class Meta:
+                register = False
+
+        class Word(Token):
+            type = marshmallow.fields.Constant("word")
+
+            class Meta:
+                register = False
+
+        class Sentence(marshmallow.Model):
+            tokens = marshmallow.PolymorphicNestedModel(Token, many=True)
+
+            class Meta:
+                register = False
+
+        self.assertIsInstance(Sentence(tokens=[{"type": "word"}]).tokens[0], Word)
+        refs = [weakref.ref(Token), weakref.ref(Word), weakref.ref(Sentence)]
+        del Token, Word, Sentence
+        # marshmallow keeps the last schema instances in a bounded cache of its own
+        Schema._has_processors.cache_clear()
+        gc.collect()
+        self.assertEqual([None, None, None], [ref() for ref in refs])
+
+
 class SelfNested(marshmallow.Model):
     name = marshmallow.fields.String()
     friend = marshmallow.NestedModel("SelfNested")
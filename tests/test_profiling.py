@@ -0,0 +1,83 @@
+import io
+import unittest
+
+from marshmallow import validate
+
+import marshmallow_objects as marshmallow
+
+
+class Person(marshmallow.Model):
+    name = marshmallow.fields.Str(validate=validate.Regexp(r"^[A-Za-z ]+$"))
+    tags = marshmallow.fields.List(marshmallow.fields.Str())
+
+    @marshmallow.post_load
+    def set_name(self, data, **kwargs):
+        return data
+
+
+class Company(marshmallow.Model):
+    owner = marshmallow.NestedModel(Person)
+    workers = marshmallow.NestedModel(Person, many=True)
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.data = {"owner": {"name": "John Doe", "tags": ["a", "b"]}, "workers": [{"name": "Bob"}, {"name": "Alice"}]}
+
+    def test_stats(self):
+        with marshmallow.Profiler() as profiler:
+            obj = Company.load(self.data)
+            obj.dump()
+            Company.validate(self.data)
+        stats = profiler.stats
+        self.assertEqual(1, stats[("Company", "*", "load")][0])
+        self.assertEqual(1, stats[("Company", "*", "dump")][0])
+        self.assertEqual(1, stats[("Company", "*", "validate")][0])
+        self.assertEqual(2, stats[("Company", "owner", "load")][0])
+        self.assertEqual(6, stats[("Person", "name", "load")][0])
+        self.assertEqual(3, stats[("Person", "name", "dump")][0])
+        self.assertEqual(4, stats[("Person", "tags[]", "load")][0])
+        self.assertEqual(6, stats[("Person", "set_name", "hook")][0])
+        self.assertEqual(6, stats[("Person", "__make_object__", "hook")][0])
+        for calls, elapsed in stats.values():
+            self.assertGreaterEqual(elapsed, 0)
+
+    def test_ranking(self):
+        with marshmallow.Profiler() as profiler:
+            Company.load(self.data)
+        ranking = profiler.ranking()
+        self.assertEqual(("Company", "*", "load", 1), ranking[0][:4])
+        self.assertEqual(sorted(ranking, key=lambda record: -record[4]), ranking)
+
+    def test_report(self):
+        with marshmallow.Profiler() as profiler:
+            Company.load(self.data)
+        report = profiler.report(limit=2)
+        self.assertEqual(3, len(report.splitlines()))
+        self.assertIn("Company", report.splitlines()[1])
+        fp = io.StringIO()
+        profiler.print_report(file=fp)
+        self.assertIn("set_name", fp.getvalue())
+
+    def test_inactive(self):
+        with marshmallow.Profiler() as profiler:
+            pass
+        Company.load(self.data)
+        self.assertEqual({}, profiler.stats)
+        self.assertIs(marshmallow.fields.Field.serialize, marshmallow.profiling._field_serialize)
+
+    def test_nested_profilers(self):
+        with marshmallow.Profiler():
+            with self.assertRaises(RuntimeError):
+                with marshmallow.Profiler():
+                    pass
+
+    def test_decorator(self):
+        fp = io.StringIO()
+
+        @marshmallow.profile(limit=1, file=fp)
+        def load():
+            return Company.load(self.data)
+
+        self.assertIsInstance(load(), Company)
+        self.assertEqual(2, len(fp.getvalue().splitlines()))